@@ -0,0 +1,171 @@
+"""
+Batch rendering of chaos game figures. A manifest lists one job per figure,
+as dicts with the keys
+
+    n, r, steps, color, cmap, outfile
+
+and optionally weights (see ChaosGame) and raster (see ChaosGame.savepng).
+The jobs are rendered on a process pool, e.g.
+
+    python batch_render.py manifest.json
+
+where manifest.json holds a list of such dicts.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+import matplotlib
+from chaos_game import ChaosGame
+
+DEFAULTS = {"steps": 10005, "color": False, "cmap": "jet", "raster": False}
+
+
+def _job(job):
+    """
+    Returns the job with defaults filled in, checking that it is complete.
+    """
+
+    job = {**DEFAULTS, **job}
+    missing = [key for key in ("n", "r", "outfile") if key not in job]
+    if missing:
+        raise ValueError(f"Job is missing {', '.join(missing)}: {job}")
+    # png files only, ".png" is appended if the file name has no suffix
+    suffix = os.path.splitext(job["outfile"])[1]
+    if not suffix:
+        job["outfile"] += ".png"
+    elif suffix != ".png":
+        raise ValueError(f"outfile must be a .png file: {job['outfile']}")
+    return job
+
+
+def _record(job, seed):
+    """
+    Returns the description of a job stored next to its output, used to
+    decide whether the output is up to date. It is passed through JSON, so
+    it compares equal to a record read back from disk.
+    """
+
+    return json.loads(json.dumps({**job, "seed": seed}, sort_keys=True))
+
+
+def _seed(job, seed):
+    """
+    Returns the SeedSequence of a job, derived from the base seed and the
+    content of the job, so a job gets the same points no matter its place
+    in the manifest or the number of workers.
+    """
+
+    key = json.dumps(_record(job, seed), sort_keys=True)
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return np.random.SeedSequence([seed, int(digest[:32], 16)])
+
+
+def up_to_date(job, seed=0):
+    """
+    Returns True if the output of job exists and was rendered from the same
+    job and seed, according to the record saved next to it.
+    """
+
+    job = _job(job)
+    try:
+        with open(job["outfile"] + ".json") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return os.path.exists(job["outfile"]) and record == _record(job, seed)
+
+
+def render(job, seed=0):
+    """
+    Render a single job and write its output, together with a record of the
+    job. Any figure created is closed afterwards. Returns the wall time in
+    seconds.
+    """
+
+    job = _job(job)
+    start = perf_counter()
+    game = ChaosGame(job["n"], job["r"], job.get("weights"))
+    game.iterate(job["steps"], rng=np.random.default_rng(_seed(job, seed)))
+    os.makedirs(os.path.dirname(job["outfile"]) or ".", exist_ok=True)
+    game.savepng(job["outfile"], job["color"], job["cmap"], job["raster"])
+    with open(job["outfile"] + ".json", "w") as f:
+        json.dump(_record(job, seed), f)
+    return perf_counter() - start
+
+
+def _init_worker():
+    # The workers only write files, so they never need an interactive backend.
+    matplotlib.use("Agg")
+
+
+def render_batch(jobs, workers=None, seed=0, force=False):
+    """
+    Render the jobs of a manifest on a process pool. Jobs whose outputs are
+    up to date are skipped, unless force is True.
+
+    Parameters
+    ----------
+    jobs:       list of dicts, or path to a JSON file holding one
+    workers:    int, number of worker processes. Default is os.cpu_count().
+                With 1 worker, the jobs run in this process
+    seed:       int, base seed, combined with each job to seed its points
+    force:      bool, if True all jobs are rendered
+
+    Returns
+    -------
+    report:     list of dicts with outfile, status ("rendered" or
+                "skipped") and seconds of each job, in manifest order
+    """
+
+    if isinstance(jobs, str):
+        with open(jobs) as f:
+            jobs = json.load(f)
+    jobs = [_job(job) for job in jobs]
+    outfiles = [os.path.abspath(job["outfile"]) for job in jobs]
+    duplicates = sorted({f for f in outfiles if outfiles.count(f) > 1})
+    if duplicates:
+        raise ValueError(f"Several jobs write to {', '.join(duplicates)}")
+    todo = [job for job in jobs if force or not up_to_date(job, seed)]
+
+    workers = os.cpu_count() if workers is None else int(workers)
+    if workers < 1:
+        raise ValueError("workers must be a positive integer!")
+    if workers == 1 or len(todo) <= 1:
+        seconds = [render(job, seed) for job in todo]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+            seconds = list(pool.map(render, todo, [seed] * len(todo)))
+
+    timings = {job["outfile"]: t for job, t in zip(todo, seconds)}
+    return [
+        {
+            "outfile": job["outfile"],
+            "status": "rendered" if job["outfile"] in timings else "skipped",
+            "seconds": timings.get(job["outfile"], 0.0),
+        }
+        for job in jobs
+    ]
+
+
+def print_report(report):
+    """
+    Print the per-job timings of render_batch as a table.
+    """
+
+    print(f"{'outfile':>24} {'status':>9} {'[s]':>8}")
+    for entry in report:
+        outfile, status, seconds = entry["outfile"], entry["status"], entry["seconds"]
+        print(f"{outfile:>24} {status:>9} {seconds:>8.3f}")
+    total = sum(entry["seconds"] for entry in report)
+    print(f"{'total':>24} {'':>9} {total:>8.3f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python batch_render.py manifest.json [workers]")
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    print_report(render_batch(sys.argv[1], workers))
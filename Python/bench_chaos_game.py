@@ -0,0 +1,101 @@
+"""
+Timings for ChaosGame. Run as a script, e.g.
+
+    python bench_chaos_game.py
+"""
+import os
+import tracemalloc
+import numpy as np
+from chaos_game import ChaosGame
+from raster import Rasterizer
+from bench_util import timeit
+
+
+def bench_iterate(steps_list=(10 ** 5, 10 ** 6, 10 ** 7), n=3, r=1 / 2):
+    game = ChaosGame(n, r)
+    print(f"ChaosGame.iterate, n = {n}, r = {r:.3f}")
+    print(f"{'steps':>10} {'loop [s]':>10} {'vector [s]':>11} {'speedup':>8}")
+    for steps in steps_list:
+        repeat = 1 if steps > 10 ** 6 else 3
+        t_loop = timeit(lambda: game.iterate(steps, method="loop"), repeat)
+        t_vec = timeit(lambda: game.iterate(steps, method="vectorized"), repeat)
+        print(f"{steps:>10} {t_loop:>10.3f} {t_vec:>11.4f} {t_loop / t_vec:>8.1f}")
+
+
+def bench_parallel(steps=10 ** 7, max_workers=None, n=3, r=1 / 2):
+    game = ChaosGame(n, r)
+    max_workers = os.cpu_count() if max_workers is None else max_workers
+    print(f"ChaosGame.iterate_parallel, {steps} steps, n = {n}, r = {r:.3f}")
+    print(f"{'workers':>8} {'points [s]':>11} {'raster [s]':>11} {'speedup':>8}")
+    t_ref = None
+    for workers in range(1, max_workers + 1):
+        t_points = timeit(
+            lambda: game.iterate_parallel(steps, workers, seed=1), repeat=1
+        )
+        raster = Rasterizer((-1, 1, -1, 1))
+        t_raster = timeit(
+            lambda: game.iterate_parallel(steps, workers, seed=1, raster=raster),
+            repeat=1,
+        )
+        t_ref = t_points if t_ref is None else t_ref
+        speedup = t_ref / t_points
+        print(f"{workers:>8} {t_points:>11.3f} {t_raster:>11.3f} {speedup:>8.2f}")
+
+
+def bench_composed(steps=10 ** 7, ns=(3, 4, 5, 6), r=1 / 2):
+    """
+    Throughput of the vectorized iterate taking one move per step (k = 1)
+    and k moves per step with the table of composed maps, for k up to the
+    default of ChaosGame.
+    """
+    print(f"ChaosGame composed maps, {steps} steps, r = {r:.3f}")
+    print(f"{'n':>3} {'k':>3} {'table':>6} {'[s]':>8} {'points/s':>10} {'speedup':>8}")
+    for n in ns:
+        game = ChaosGame(n, r)
+        t_ref = None
+        for k in range(1, game.k + 1):
+            seconds = timeit(lambda: game.iterate(steps, k=k), 1)
+            t_ref = seconds if t_ref is None else t_ref
+            print(
+                f"{n:>3} {k:>3} {n ** k:>6} {seconds:>8.3f} {steps / seconds:>10.3g}"
+                f" {t_ref / seconds:>8.2f}"
+            )
+
+
+def bench_dtype(steps=10 ** 7, n=3, r=1 / 2, dtypes=(None, np.float32, np.float16)):
+    """
+    Memory and time of iterate, gradient_color and rasterize for the point
+    types. Memory is the size of the stored points and indices, and the peak
+    traced by tracemalloc (which NumPy reports to) during iterate.
+    """
+    game = ChaosGame(n, r)
+
+    def color():
+        game.__dict__.pop("_gradient_color", None)
+        return game.gradient_color
+
+    print(f"ChaosGame dtype, {steps} steps, n = {n}, r = {r:.3f}")
+    print(
+        f"{'dtype':>8} {'stored [MB]':>12} {'peak [MB]':>10} {'iterate [s]':>12}"
+        f" {'color [s]':>10} {'raster [s]':>11}"
+    )
+    for dtype in dtypes:
+        tracemalloc.start()
+        t_iterate = timeit(lambda: game.iterate(steps, dtype=dtype), 1)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        stored = game.points.nbytes + game.idx.nbytes
+        t_color = timeit(color, 1)
+        t_raster = timeit(lambda: game.rasterize(color=True), 1)
+        name = np.dtype(dtype).name
+        print(
+            f"{name:>8} {stored / 2 ** 20:>12.1f} {peak / 2 ** 20:>10.1f}"
+            f" {t_iterate:>12.3f} {t_color:>10.3f} {t_raster:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    bench_iterate()
+    bench_parallel()
+    bench_composed()
+    bench_dtype()
@@ -0,0 +1,177 @@
+"""
+Timings for the ODE models. Run as a script, e.g.
+
+    python bench_ode.py
+"""
+import numpy as np
+from scipy import integrate
+from exp_decay import ExponentialDecay
+from pendulum import Pendulum, DampenedPendulum
+import ode_model
+from double_pendulum import DoublePendulum
+from bench_util import timeit
+
+
+def bench_solve(T=20, dt=0.01):
+    """
+    Cost per solve of a single integration, compared to the previous
+    implementations, which integrated once per stored component.
+    """
+    models = [
+        ("ExponentialDecay", ExponentialDecay(0.4), 5, 2),
+        ("Pendulum", Pendulum(), [np.pi / 3, 0], 3),
+        ("DoublePendulum", DoublePendulum(), [np.pi / 2, 0, np.pi / 4, 0], 5),
+    ]
+    print(f"solve, T = {T}, dt = {dt}")
+    print(f"{'model':>17} {'before [s]':>11} {'after [s]':>10} {'speedup':>8}")
+    for name, model, y0, calls in models:
+        t = np.linspace(0, T, int(T / dt + 1))
+
+        def before():
+            for _ in range(calls):
+                integrate.solve_ivp(
+                    model, [0, T], np.atleast_1d(y0), method=model.method, t_eval=t
+                )
+
+        def after():
+            model.solve(y0, T, dt)
+
+        t_before, t_after = timeit(before), timeit(after)
+        speedup = t_before / t_after
+        print(f"{name:>17} {t_before:>11.4f} {t_after:>10.4f} {speedup:>8.2f}")
+
+
+def counting(cls):
+    """
+    Returns a subclass of the model class cls counting the calls to its
+    right-hand side in the attribute calls. solve_ivp does not include the
+    evaluations used for finite difference Jacobians in nfev.
+    """
+
+    class Counting(cls):
+        calls = 0
+
+        def __call__(self, t, y):
+            self.calls += 1
+            return super().__call__(t, y)
+
+    return Counting
+
+
+def bench_jacobian(T=100, dt=0.01):
+    """
+    Right-hand side evaluations and wall time of the implicit solvers with
+    the analytic Jacobian and with finite difference estimates.
+    """
+    models = [
+        ("Pendulum", counting(Pendulum)(), [np.pi / 3, 0]),
+        ("DoublePendulum", counting(DoublePendulum)(), [np.pi / 2, 0, np.pi / 4, 0]),
+    ]
+    print(f"Jacobian, T = {T}, dt = {dt}")
+    print(f"{'model':>15} {'method':>7} {'jac':>6} {'calls':>7} {'njev':>5} {'[s]':>7}")
+    for name, model, y0 in models:
+        for method in ("Radau", "BDF"):
+            for jac in (False, True):
+                seconds = timeit(
+                    lambda: model.solve(list(y0), T, dt, method=method, jac=jac), 1
+                )
+                model.calls = 0
+                model.solve(list(y0), T, dt, method=method, jac=jac)
+                calls, njev = model.calls, model.solution.njev
+                print(
+                    f"{name:>15} {method:>7} {str(jac):>6} {calls:>7} {njev:>5}"
+                    f" {seconds:>7.3f}"
+                )
+
+
+def bench_symplectic(T=1000, dt=0.01):
+    """
+    Drift in total energy (potential + kinetic) and throughput of the fixed
+    step methods, compared to the adaptive solve_ivp methods.
+    """
+    models = [
+        ("Pendulum", Pendulum(), [np.pi / 3, 0]),
+        ("DoublePendulum", DoublePendulum(), [np.pi / 2, 0, np.pi / 4, 0]),
+    ]
+    methods = ("RK45", "Radau", "verlet", "yoshida4")
+    print(f"Energy drift, T = {T}, dt = {dt}")
+    print(f"{'model':>15} {'method':>9} {'[s]':>7} {'steps/s':>9} {'max |dE|':>10}")
+    for name, model, y0 in models:
+        for method in methods:
+            seconds = timeit(lambda: model.solve(list(y0), T, dt, method=method), 1)
+            energy = model.potential + model.kinetic
+            drift = np.abs(energy - energy[0]).max()
+            steps = len(model.t) / seconds
+            print(
+                f"{name:>15} {method:>9} {seconds:>7.3f} {steps:>9.0f} {drift:>10.2e}"
+            )
+
+
+def bench_rhs(batch=10000, calls=20000):
+    """
+    Right-hand side evaluations per second through __call__ and through the
+    compiled _fast_rhs (Numba if installed, else NumPy), for a single state
+    and for a batch of states.
+    """
+    models = [
+        ("Pendulum", Pendulum(), 2),
+        ("DampenedPendulum", DampenedPendulum(0.8), 2),
+        ("DoublePendulum", DoublePendulum(), 4),
+    ]
+    backend = "numba" if ode_model.njit is not None else "numpy"
+    print(f"Right-hand side evaluations per second, fast backend: {backend}")
+    print(f"{'model':>17} {'N':>6} {'__call__':>10} {'fast':>10} {'speedup':>8}")
+    for name, model, d in models:
+        fast = model._fast_rhs()
+        for N, repeat in ((1, calls), (batch, calls // 100)):
+            y = np.random.random((d, N)) if N > 1 else np.random.random(d)
+            fast(0, y)
+
+            def slow_calls():
+                for _ in range(repeat):
+                    np.asarray(model(0, y))
+
+            def fast_calls():
+                for _ in range(repeat):
+                    fast(0, y)
+
+            slow_rate = repeat / timeit(slow_calls)
+            fast_rate = repeat / timeit(fast_calls)
+            print(
+                f"{name:>17} {N:>6} {slow_rate:>10.0f} {fast_rate:>10.0f}"
+                f" {fast_rate / slow_rate:>8.2f}"
+            )
+
+
+def bench_decay(rates=10 ** 5, T=10, dt=0.1, sample=1000):
+    """
+    Cost of the exponential decay for many decay rates, evaluating the exact
+    solution for all rates in one broadcasted call, compared to one numerical
+    solve per rate (timed for sample rates and scaled up). Also reports the
+    largest error of the numerical solutions.
+    """
+    a = np.random.default_rng(0).uniform(0.01, 2, rates)
+    u0 = 5
+
+    t_exact = timeit(lambda: ExponentialDecay(a).exact(u0, T, dt))
+    t, u = ExponentialDecay(a).exact(u0, T, dt)
+
+    def numerical():
+        return [ExponentialDecay(rate).solve(u0, T, dt)[1] for rate in a[:sample]]
+
+    t_numerical = timeit(numerical, 1) * rates / sample
+    error = np.abs(np.array(numerical()) - u[:sample]).max()
+    print(f"Exponential decay, {rates} rates, {len(t)} time points")
+    print(f"{'exact [s]':>10} {'solve [s]':>10} {'speedup':>9} {'max error':>10}")
+    print(
+        f"{t_exact:>10.4f} {t_numerical:>10.2f} {t_numerical / t_exact:>9.0f}"
+        f" {error:>10.2e}"
+    )
+
+
+if __name__ == "__main__":
+    bench_solve()
+    bench_decay()
+    bench_jacobian()
+    bench_symplectic()
+    bench_rhs()
@@ -0,0 +1,17 @@
+"""
+Helpers shared by the benchmark scripts bench_*.py.
+"""
+from time import perf_counter
+import numpy as np
+
+
+def timeit(func, repeat=3):
+    """
+    Returns the best wall time in seconds of repeat calls to func.
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return best
@@ -0,0 +1,38 @@
+"""
+Timings for Variations. Run as a script, e.g.
+
+    python bench_variations.py
+"""
+import numpy as np
+from variations import Variations
+from bench_util import timeit
+
+
+def bench_evaluate(N=10 ** 7, chunk_sizes=(2 ** 12, 2 ** 14, 2 ** 16, 2 ** 18)):
+    """
+    Cost of all four transformations of N points, one transformation at a
+    time with the static methods, compared to the fused evaluate for
+    different chunk sizes.
+    """
+    names = ["linear", "handkerchief", "swirl", "disc"]
+    x, y = np.random.default_rng(0).uniform(-1, 1, (2, N))
+    out = np.empty((len(names), 2, N))
+
+    def separate():
+        for name in names:
+            getattr(Variations, name)(x, y)
+
+    t_separate = timeit(separate, 1)
+    print(f"Variations, {N} points, {', '.join(names)}")
+    print(f"{'chunk':>8} {'[s]':>8} {'points/s':>10} {'speedup':>8}")
+    print(f"{'-':>8} {t_separate:>8.3f} {N / t_separate:>10.3g} {1:>8.2f}")
+    for chunk_size in chunk_sizes:
+        seconds = timeit(lambda: Variations.evaluate(x, y, names, chunk_size, out), 1)
+        print(
+            f"{chunk_size:>8} {seconds:>8.3f} {N / seconds:>10.3g}"
+            f" {t_separate / seconds:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    bench_evaluate()
@@ -1,5 +1,218 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
 import numpy as np
 import matplotlib.pyplot as plt
+from raster import Rasterizer
+from sampling import AliasSampler
+
+
+def _linear_scan(x0, a, r):
+    """
+    Evaluate the linear recurrence X[i+1] = r*X[i] + a[i] without a Python
+    loop over the steps.
+
+    The steps are split into blocks of length B, chosen such that r**B is
+    below machine precision. Within a block the recurrence is a cumulative
+    sum with geometric weights r**(-j), which never exceed 2**60, so the
+    sum neither overflows nor loses relative precision for small r. The
+    states carried between blocks are damped by r**B, so each block only
+    needs the end state of the block before it.
+
+    Parameters
+    ----------
+    x0:     NumPy array of size d, starting state X[0]
+    a:      NumPy array of size (M, d), additive terms a[0], ..., a[M-1]
+    r:      float, 0 <= r <= 1, contraction ratio
+
+    Returns
+    -------
+    X:      NumPy array of size (M+1, d), X[0] = x0 followed by the M states
+    """
+
+    a = np.asarray(a, dtype=float)
+    M, d = a.shape
+    X = np.empty((M + 1, d))
+    X[0] = x0
+    if M == 0:
+        return X
+
+    if r == 0:
+        B = 1
+    elif r < 1:
+        B = int(np.ceil(60 * np.log(2) / -np.log(r)))
+    else:
+        B = M
+    B = max(1, min(B, M))
+    nb = -(-M // B)
+
+    padded = np.zeros((nb * B, d))
+    padded[:M] = a
+    padded = padded.reshape(nb, B, d)
+    j = np.arange(B)
+    local = np.cumsum(padded * r ** -j[:, None], axis=1)
+    local *= (r ** j)[:, None]
+
+    # State entering each block. r**B is below machine precision (or B
+    # covers all steps), so two terms of the geometric series suffice.
+    rho = r ** B
+    start = np.empty((nb, d))
+    start[0] = x0
+    if nb > 1:
+        start[1:] = local[:, -1][:-1]
+        start[2:] += rho * local[:, -1][:-2]
+        start[1] += rho * start[0]
+
+    local += (r ** (j + 1))[:, None] * start[:, None, :]
+    X[1:] = local.reshape(nb * B, d)[:M]
+    return X
+
+
+def _composed_tables(offsets, r, k):
+    """
+    Returns the tables of the m-step composed maps of the chaos game, for
+    m = 1, ..., k, stacked in one NumPy array, and the row where each table
+    starts.
+
+    Starting from x, m moves to the corners i1, ..., im lead to
+    r**m * x + T_m[c], with the code c = i1*n**(m-1) + ... + im. The table
+    T_m of size (n**m, 2) follows from T_1 = offsets and
+    T_m[c*n + i] = r * T_(m-1)[c] + offsets[i].
+
+    Parameters
+    ----------
+    offsets:    NumPy array of size (n, 2), the offsets (1 - r)*corners
+    r:          float, contraction ratio
+    k:          int, largest number of composed moves
+
+    Returns
+    -------
+    tables:     NumPy array of size (n + n**2 + ... + n**k, 2)
+    starts:     NumPy array of size k, row of T_1, ..., T_k in tables
+    """
+
+    T = [offsets]
+    for _ in range(k - 1):
+        T.append((r * T[-1][:, None, :] + offsets[None, :, :]).reshape(-1, 2))
+    starts = np.cumsum([0] + [len(table) for table in T[:-1]])
+    return np.concatenate(T), starts
+
+
+def _composed_scan(x0, moves, offsets, r, k, tables=None):
+    """
+    Evaluate the chaos game recurrence X[i+1] = r*X[i] + offsets[moves[i]],
+    as _linear_scan(x0, offsets[moves], r), but k moves at a time.
+
+    The moves are grouped k by k, and every k-th point is found by a
+    _linear_scan with ratio r**k over the k-step composed maps, a factor k
+    fewer steps. The points in between are then filled in by one lookup in
+    the tables of the 1, ..., k step maps each, see _composed_tables. As
+    the tables have n**k rows, this pays off for small n and k.
+
+    Parameters
+    ----------
+    x0:         NumPy array of size 2, starting point X[0]
+    moves:      NumPy array of size M, corner indices
+    offsets:    NumPy array of size (n, 2), the offsets (1 - r)*corners
+    r:          float, contraction ratio
+    k:          int, number of moves per step
+    tables:     result of _composed_tables(offsets, r, k), computed if None
+
+    Returns
+    -------
+    X:          NumPy array of size (M+1, 2), X[0] = x0 followed by the M
+                points
+    """
+
+    if k == 1:
+        return _linear_scan(x0, offsets[moves], r)
+    n = len(offsets)
+    tables, starts = _composed_tables(offsets, r, k) if tables is None else tables
+
+    M = len(moves)
+    nb = M // k
+    groups = np.asarray(moves[: nb * k]).reshape(nb, k)
+    codes = np.empty((nb, k), dtype=np.intp)
+    codes[:, 0] = groups[:, 0]
+    for m in range(1, k):
+        np.multiply(codes[:, m - 1], n, out=codes[:, m])
+        codes[:, m] += groups[:, m]
+
+    X = np.empty((M + 1, 2))
+    X[0] = x0
+    steps = np.take(tables, starts[-1] + codes[:, -1], axis=0, mode="clip")
+    coarse = _linear_scan(x0, steps, r ** k)
+    # The codes are in range by construction, and mode="clip" skips the
+    # much slower bounds checking of the default mode.
+    codes += starts
+    fine = X[1 : nb * k + 1].reshape(nb, k, 2)
+    np.take(tables, codes, axis=0, out=fine, mode="clip")
+    # Viewing the points as complex numbers x + iy, adding r**m times the
+    # preceding coarse point is a single outer product.
+    fine = fine.view(complex)[:, :, 0]
+    coarse = coarse[:-1].view(complex)[:, 0]
+    fine += np.multiply.outer(coarse, r ** np.arange(1, k + 1))
+    if nb * k < M:
+        X[nb * k :] = _linear_scan(X[nb * k], offsets[moves[nb * k :]], r)
+    return X
+
+
+def _gradient_scan(idx, start=None):
+    """
+    Returns the gradient colors C[i+1] = (C[i] + idx[i+1])/2 of a sequence
+    of corner indices, as a NumPy array of size len(idx). C[0] = idx[0]
+    unless start, the color preceding idx[0], is given.
+    """
+
+    idx = np.asarray(idx, dtype=float)[:, None]
+    if len(idx) == 0:
+        return np.zeros(0)
+    if start is None:
+        return _linear_scan(idx[0], idx[1:] / 2, 1 / 2)[:, 0]
+    return _linear_scan([start], idx / 2, 1 / 2)[1:, 0]
+
+
+def _index_dtype(n):
+    """
+    Returns the smallest unsigned integer type holding the indices of n
+    corners.
+    """
+
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.uint64
+
+
+def _iterate_worker(
+    n, r, weights, steps, discard, seed, chunk_size, raster, color, dtype
+):
+    """
+    Generate the share of one worker in ChaosGame.iterate_parallel, using
+    its own Generator seeded by the SeedSequence seed. Returns the points
+    and indices, or the Rasterizer raster with the points added.
+    """
+
+    game = ChaosGame(n, r, weights)
+    rng = np.random.default_rng(seed)
+    chunks = game.iterate_chunks(steps, chunk_size, discard, rng=rng, dtype=dtype)
+    if raster is None:
+        chunks = list(chunks)
+        if not chunks:
+            # steps <= discard: no points, but of the same types as iterate
+            return (
+                np.empty((0, 2), dtype=float if dtype is None else dtype),
+                np.empty(0, dtype=int if dtype is None else _index_dtype(n)),
+            )
+        points = np.concatenate([points for points, idx in chunks])
+        idx = np.concatenate([idx for points, idx in chunks])
+        return points, idx
+
+    C = None
+    for points, idx in chunks:
+        if color:
+            C = _gradient_scan(idx, None if C is None else C[-1])
+        raster.add(points, C)
+    return raster
 
 
 class ChaosGame:
@@ -8,33 +221,78 @@ class ChaosGame:
     within the n-gon, using stochastic simulations.
     """
 
-    def __init__(self, n, r=1 / 2):
+    VECTORIZE_THRESHOLD = 1000
+    COMPOSED_TABLE_SIZE = 2048
+
+    def __init__(self, n, r=1 / 2, weights=None):
         """
         Constructor that ensure the parameters have legal value and calls
         _generate_ngon.
 
         Parameters
         ----------
-        n:      int, number of points
-        r:      float, ratio between two points
+        n:          int, number of points
+        r:          float, ratio between two points
+        weights:    arraylike of size n, relative probabilities of selecting
+                    each corner. Default is None, selecting the corners
+                    uniformly
 
         Stores
         -------
-        n:      int
-        r:      float
-        list:   generated by _generate_ngon
+        n:          int
+        r:          float
+        list:       generated by _generate_ngon
+        weights:    NumPy array of size n or None
+        k:          int, default number of moves per step of the vectorized
+                    iteration, the largest k with n**k <= COMPOSED_TABLE_SIZE
+
+        n is read-only, as the corners, weights and k depend on it. r may
+        be changed, which recomputes the maps of the moves.
         """
         try:
-            self.n = int(n)
-            self.r = float(r)
+            self._n = int(n)
             if n < 3 or r < 0 or r > 1:
                 raise ValueError(
                     "Inacceptable value of n or r! Remember n > 2 and 0 < r < 1!"
                 )
             self.list = self._generate_ngon()
+            self.r = r
         except:
             raise ValueError("n must be int and r must be float!")
 
+        self.k = 1
+        while self.n ** (self.k + 1) <= self.COMPOSED_TABLE_SIZE:
+            self.k += 1
+
+        self.weights = None
+        self._sampler = None
+        if weights is not None:
+            if len(weights) != self.n:
+                raise ValueError("weights must have one value for each corner!")
+            self._sampler = AliasSampler(weights)
+            self.weights = self._sampler.prob
+
+    @property
+    def n(self):
+        return self._n
+
+    @property
+    def r(self):
+        return self._r
+
+    @r.setter
+    def r(self, r):
+        """
+        Set r, and with it the offsets (1 - r)*corners of the moves. The
+        composed maps depend on r as well, and are recomputed when needed.
+        """
+        r = float(r)
+        if r < 0 or r > 1:
+            raise ValueError("r must be between 0 and 1!")
+        self._r = r
+        self._offsets = (1 - r) * self.list
+        self._tables = {}
+
     def _generate_ngon(self):
         """
         Generate a n-gon. Takes no parameters and return the corners in the
@@ -56,20 +314,50 @@ class ChaosGame:
         ax.axis("off")
         plt.scatter(*zip(*list), s=3)
 
-    def _starting_point(self):
+    def _starting_point(self, rng=None):
         """
-        Select a random starting point.
+        Select a random starting point, using the numpy.random.Generator rng
+        if given and the global random state otherwise.
         """
 
         n = self.n
         list = self.list
-        w = np.random.random(size=n)
+        w = (np.random if rng is None else rng).random(size=n)
         X = np.zeros((1, 2))
         w = w / w.sum()
         X = sum(wi * ci for wi, ci in zip(w, list))
         return X
 
-    def iterate(self, steps, discard=5):
+    def _random_indices(self, size, rng=None):
+        """
+        Draw size corner indices, uniformly or according to weights, using
+        the numpy.random.Generator rng if given and the global random state
+        otherwise.
+        """
+
+        if self._sampler is not None:
+            return self._sampler.sample(size, rng)
+        if rng is None:
+            return np.random.randint(0, self.n, size=size)
+        return rng.integers(0, self.n, size=size)
+
+    def _scan(self, x0, moves, k=None):
+        """
+        Returns x0 followed by the points reached by the moves, found with
+        _composed_scan taking k moves per step (default self.k). The tables
+        of the composed maps are computed once per k and kept.
+        """
+
+        k = self.k if k is None else int(k)
+        if k < 1:
+            raise ValueError("k must be a positive integer!")
+        if k > 1 and k not in self._tables:
+            self._tables[k] = _composed_tables(self._offsets, self.r, k)
+        return _composed_scan(x0, moves, self._offsets, self.r, k, self._tables.get(k))
+
+    def iterate(
+        self, steps, discard=5, method=None, rng=None, dtype=None, k=None
+    ):
         """
         Generate a list containing points within the n-gon.
 
@@ -77,6 +365,23 @@ class ChaosGame:
         ----------
         steps:      Number of points
         discard:    Discarding the first x points. Default is 5
+        method:     "loop", "vectorized" or None. The loop iterates one step
+                    at a time, while the vectorized method evaluates the
+                    recurrence with _composed_scan. Default is None, using
+                    the vectorized method when steps >= VECTORIZE_THRESHOLD
+        rng:        numpy.random.Generator to draw from. Default is None,
+                    using the global random state
+        dtype:      floating point type of the stored points, e.g.
+                    np.float32 or np.float16 to save memory. The indices are
+                    then stored with the smallest unsigned integer type
+                    holding them (np.uint8 for n <= 256), and the points
+                    are generated a chunk at a time with iterate_chunks, so
+                    no full size float64 array is allocated. Default is
+                    None, storing float64 points and int64 indices
+        k:          int, number of moves per step of the vectorized method,
+                    using the table of all n**k compositions of k moves.
+                    Default is None, using self.k. k=1 evaluates the moves
+                    one by one with _linear_scan
 
         Stores
         -------
@@ -84,62 +389,315 @@ class ChaosGame:
         idx:        List of indices selected in each iteration
         """
 
-        n = self.n
+        if method is None:
+            method = "vectorized" if steps >= self.VECTORIZE_THRESHOLD else "loop"
+        if method not in ("loop", "vectorized"):
+            raise ValueError("method must be either loop or vectorized")
+
+        if dtype is not None and method == "vectorized":
+            points = np.empty((max(steps - discard, 0), 2), dtype=dtype)
+            idx = np.empty(len(points), dtype=_index_dtype(self.n))
+            done = 0
+            chunks = self.iterate_chunks(
+                steps, discard=discard, rng=rng, dtype=dtype, k=k
+            )
+            for X, i in chunks:
+                points[done : done + len(X)] = X
+                idx[done : done + len(X)] = i
+                done += len(X)
+            self.points, self.idx = points, idx
+            return
+
         r = self.r
-        corners = self._generate_ngon()
-        X = np.zeros((steps, 2))
-        X[0, :] = self._starting_point()
-        idx = np.random.randint(0, n, size=steps)
-        ci = np.array([corners[i] for i in idx])
-        for i in range(steps - 1):
-            X[i + 1, :] = r * X[i, :] + (1 - r) * ci[i + 1]
+        x0 = self._starting_point(rng)
+        idx = self._random_indices(steps, rng)
+        if method == "vectorized":
+            X = self._scan(x0, idx[1:], k)
+        else:
+            X = np.zeros((steps, 2))
+            X[0, :] = x0
+            ci = self._offsets[idx]
+            for i in range(steps - 1):
+                X[i + 1, :] = r * X[i, :] + ci[i + 1]
         self.points, self.idx = X[discard:, :], idx[discard:]
+        if dtype is not None:
+            self.points = self.points.astype(dtype)
+            self.idx = self.idx.astype(_index_dtype(self.n))
 
-    def plot(self, color=False, cmap="jet"):
-        if color:
-            colors = self.gradient_color[:, 0]
+    def iterate_chunks(
+        self,
+        steps,
+        chunk_size=10 ** 6,
+        discard=5,
+        rng=None,
+        dtype=None,
+        k=None,
+        growth=1,
+    ):
+        """
+        Generator version of iterate, yielding the points in blocks of at
+        most chunk_size points. The last point of each block is carried
+        over as the state of the next block, so concatenating the blocks
+        gives the same points and indices as iterate (for the same random
+        state), while only O(chunk_size) memory is in use at any time.
+
+        Parameters
+        ----------
+        steps:      Number of points
+        chunk_size: Maximum number of points generated per block.
+                    Default is 10**6
+        discard:    Discarding the first x points. Default is 5
+        rng:        numpy.random.Generator to draw from. Default is None,
+                    using the global random state
+        dtype:      floating point type of the yielded points, see iterate.
+                    The points are computed in float64 and converted block
+                    by block. Default is None, yielding float64
+        k:          int, number of moves per step, see iterate
+        growth:     float >= 1, factor the block size grows by after each
+                    block, e.g. 2 for blocks of chunk_size, 2*chunk_size,
+                    4*chunk_size, ... Default is 1, blocks of equal size
+
+        Yields
+        -------
+        points:     NumPy array of size (m, 2), points of the block
+        idx:        NumPy array of size m, indices selected in the block
+        """
+
+        chunk_size = int(chunk_size)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer!")
+        if growth < 1:
+            raise ValueError("growth must be at least 1!")
+
+        x = self._starting_point(rng)
+        done = 0
+        while done < steps:
+            size = min(chunk_size, steps - done)
+            idx = self._random_indices(size, rng)
+            if done == 0:
+                X = self._scan(x, idx[1:], k)
+            else:
+                X = self._scan(x, idx, k)[1:]
+            x = X[-1]
+            skip = max(0, discard - done)
+            done += size
+            chunk_size = int(chunk_size * growth)
+            if skip >= size:
+                continue
+            if dtype is None:
+                yield X[skip:], idx[skip:]
+            else:
+                yield X[skip:].astype(dtype), idx[skip:].astype(_index_dtype(self.n))
+
+    def iterate_parallel(
+        self,
+        steps,
+        workers=None,
+        seed=None,
+        discard=5,
+        raster=None,
+        color=False,
+        chunk_size=10 ** 6,
+        dtype=None,
+    ):
+        """
+        Parallel version of iterate, splitting the points between workers
+        processes. Each worker draws from its own Generator, spawned from
+        numpy.random.SeedSequence(seed), and starts from its own random
+        starting point with its own burn-in of discard points. The result is
+        reproducible for a given seed and number of workers.
+
+        Parameters
+        ----------
+        steps:      Number of points, as in iterate. In total steps - discard
+                    points are generated
+        workers:    Number of worker processes. Default is os.cpu_count()
+        seed:       Seed of the SeedSequence. Default is None, using fresh
+                    entropy
+        discard:    Number of points discarded by each worker. Default is 5
+        raster:     Rasterizer or None. If given, the workers add their
+                    points to a copy of raster, and the copies are merged
+                    into raster instead of storing the points
+        color:      bool, if True the points added to raster are colored by
+                    their gradient color (computed per worker)
+        chunk_size: Maximum number of points a worker generates at a time
+        dtype:      floating point type of the points, see iterate
+
+        Stores
+        -------
+        points:     List containing the points (only if raster is None)
+        idx:        List of indices selected in each iteration (only if
+                    raster is None)
+        """
+
+        workers = os.cpu_count() if workers is None else int(workers)
+        if workers < 1:
+            raise ValueError("workers must be a positive integer!")
+
+        total = max(steps - discard, 0)
+        shares = [
+            total // workers + (i < total % workers) + discard for i in range(workers)
+        ]
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        empty = None if raster is None else raster.empty_copy()
+        game = (self.n, self.r, self.weights)
+        args = [
+            game + (share, discard, s, chunk_size, empty, color, dtype)
+            for share, s in zip(shares, seeds)
+        ]
+        if workers == 1:
+            results = [_iterate_worker(*args[0])]
         else:
-            colors = "black"
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_iterate_worker, *zip(*args)))
+
+        if raster is None:
+            self.points = np.concatenate([points for points, idx in results])
+            self.idx = np.concatenate([idx for points, idx in results])
+        else:
+            for partial in results:
+                raster.merge(partial)
 
+    def rasterize(self, color=False, resolution=1000):
+        """
+        Returns a Rasterizer with the points binned into a density image
+        covering the n-gon.
+
+        Parameters
+        ----------
+        color:      bool, if True the points are colored by gradient_color
+        resolution: int, number of pixels along each axis. Default is 1000
+        """
+        raster = Rasterizer((-1.02, 1.02, -1.02, 1.02), resolution)
+        raster.add(self.points, self.gradient_color if color else None)
+        return raster
+
+    def plot(self, color=False, cmap="jet", raster=False):
+        """
+        Plot the points. If raster is True, the points are binned with
+        rasterize and drawn as an image instead of scattered one by one.
+        """
         fig, ax = plt.subplots()
         ax.axis("equal")
         ax.axis("off")
+        if raster:
+            self.rasterize(color).show(ax, cmap=cmap)
+            return
+
+        if color:
+            colors = self.gradient_color
+        else:
+            colors = "black"
         ax.scatter(*zip(*self.points), s=0.2, c=colors, cmap=cmap)
 
-    def show(self, color=False, cmap="jet"):
-        self.plot(color, cmap)
+    def show(self, color=False, cmap="jet", raster=False):
+        self.plot(color, cmap, raster)
         plt.show()
 
+    def show_progressive(
+        self,
+        steps=10 ** 8,
+        color=False,
+        cmap="jet",
+        tol=0.05,
+        batch=10 ** 4,
+        growth=2,
+        resolution=1000,
+        rng=None,
+    ):
+        """
+        Interactive preview, drawing the density image of rasterize after
+        each of a sequence of growing batches of points, until the image
+        converges (see Rasterizer.refine) or steps points are generated.
+        The points are not stored.
+
+        Parameters
+        ----------
+        steps:      Maximum number of points
+        color:      bool, if True the points are colored by their gradient
+                    color
+        cmap:       colormap used for colors
+        tol:        float, convergence threshold, see Rasterizer.refine
+        batch:      int, number of points in the first batch
+        growth:     float, factor each batch grows by
+        resolution: int, number of pixels along each axis
+        rng:        numpy.random.Generator to draw from. Default is None,
+                    using the global random state
+
+        Returns
+        -------
+        raster:     Rasterizer holding the points generated
+        """
+
+        def batches():
+            C = None
+            for points, idx in self.iterate_chunks(
+                steps, batch, rng=rng, growth=growth
+            ):
+                if color:
+                    C = _gradient_scan(idx, None if C is None else C[-1])
+                yield points, C
+
+        fig, ax = plt.subplots()
+        ax.axis("equal")
+        ax.axis("off")
+        raster = Rasterizer((-1.02, 1.02, -1.02, 1.02), resolution)
+        raster.refine(batches(), tol, ax=ax, cmap=cmap)
+        plt.show()
+        return raster
+
     @property
     def gradient_color(self):
         """
-        Returns the numpy array C which contains numbers corresponding to color.
+        Returns the numpy array C of size len(points) which contains numbers
+        corresponding to color, C[i+1] = (C[i] + idx[i+1])/2.
+
+        C is found with the same vectorized scan as the points, 10**6 colors
+        at a time, stored as float32 (or float16 if the points are), and
+        cached until idx changes, i.e. it is computed once per iterate.
         """
 
-        n = self.points.shape[0]
-        C = np.zeros((n, 2))
-        C[0, :] = self.idx[0]
-        for i in range(n - 1):
-            C[i + 1, :] = 0.5 * (C[i, :] + self.idx[i + 1])
-        return C
+        cached = self.__dict__.get("_gradient_color")
+        if cached is None or cached[0] is not self.idx:
+            dtype = np.float16 if self.points.dtype == np.float16 else np.float32
+            C = np.empty(len(self.idx), dtype=dtype)
+            c = None
+            for start in range(0, len(self.idx), 10 ** 6):
+                block = _gradient_scan(self.idx[start : start + 10 ** 6], c)
+                C[start : start + len(block)] = block
+                c = block[-1]
+            self._gradient_color = cached = (self.idx, C)
+        return cached[1]
 
-    def savepng(self, outfile, color=False, cmap="jet"):
+    def savepng(self, outfile, color=False, cmap="jet", raster=False):
+        """
+        Save the points as a png file. If raster is True, the binned image
+        from rasterize is written directly, one pixel per bin, without
+        creating a matplotlib figure. Otherwise the figure drawn by plot is
+        closed once saved, so saving many figures does not keep them all
+        alive.
+        """
         if outfile.split(".")[-1] == outfile:
             outfile += ".png"
+        elif outfile.split(".")[-1] != "png":
+            raise ValueError("outfile must be a .png.file!")
+
+        if raster:
+            self.rasterize(color).savepng(outfile, cmap=cmap)
+        else:
             self.plot(color, cmap)
             plt.savefig(outfile, dpi=300, transparent=True)
-        elif outfile.split(".")[-1] == "png":
-            self.plot(color, cmap)
-            plt.savefig(outfile, dpi=300, transparent=True)
-        else:
-            raise ValueError("outfile must be a .png.file!")
+            plt.close()
 
 
 if __name__ == "__main__":
+    from batch_render import print_report, render_batch
+
     rlist = [1/2, 1/3, 1/3, 3/8, 1/3]
     nlist = [3, 4, 5, 5, 6]
     N = 10005
-    for i, (r, n) in enumerate(zip(rlist, nlist)):
-        a = ChaosGame(n, r)
-        a.iterate(N)
-        a.savepng(f"figures/chaos{i+1}.png", color=True)
+    jobs = [
+        dict(n=n, r=r, steps=N, color=True, outfile=f"figures/chaos{i+1}.png")
+        for i, (r, n) in enumerate(zip(rlist, nlist))
+    ]
+    print_report(render_batch(jobs))
@@ -1,7 +1,12 @@
+from concurrent.futures import ProcessPoolExecutor
+import math
+import shutil
+import subprocess
+import warnings
 import numpy as np
-from scipy import integrate
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
+from ode_model import ODEModel, YOSHIDA4, derived, jit
 
 g = 9.81
 
@@ -34,12 +39,245 @@ def domega2_dt(M1, M2, L1, L2, theta1, theta2, omega1, omega2):
     return num / den
 
 
-class DoublePendulum:
-    def __init__(self, M1=1, L1=1, M2=1, L2=1):
+@jit
+def _scalar_accelerations(M1, M2, L1, L2, theta1, theta2, omega1, omega2):
+    """
+    Returns domega1_dt and domega2_dt for scalar arguments, using the math
+    module and computing the trigonometric functions of delta only once.
+    """
+
+    d = theta2 - theta1
+    S, C = math.sin(d), math.cos(d)
+    sin1, sin2 = math.sin(theta1), math.sin(theta2)
+    num1 = (
+        M2 * L1 * omega1 ** 2 * S * C
+        + M2 * g * sin2 * C
+        + M2 * L2 * omega2 ** 2 * S
+        - (M1 + M2) * g * sin1
+    )
+    num2 = (
+        -M2 * L2 * omega2 ** 2 * S * C
+        + (M1 + M2) * g * sin1 * C
+        - (M1 + M2) * L2 * omega1 ** 2 * S
+        - (M1 + M2) * g * sin2
+    )
+    den1 = (M1 + M2) * L2 - M2 * L1 * C ** 2
+    den2 = (M1 + M2) * L2 - M2 * L2 * C ** 2
+    return num1 / den1, num2 / den2
+
+
+@jit
+def _double_pendulum_rhs(y, M1, M2, L1, L2, g):
+    """
+    Right-hand side of the double pendulum as a NumPy array of the same
+    size as y, which is either a single state theta1, omega1, theta2, omega2
+    or a (4, N) batch of states. Same equations as domega1_dt and
+    domega2_dt, with the trigonometric functions computed only once.
+    """
+    theta1, omega1, theta2, omega2 = y[0], y[1], y[2], y[3]
+    d = theta2 - theta1
+    S, C = np.sin(d), np.cos(d)
+    sin1, sin2 = np.sin(theta1), np.sin(theta2)
+    out = np.empty_like(y)
+    out[0] = omega1
+    out[1] = (
+        M2 * L1 * omega1 ** 2 * S * C
+        + M2 * g * sin2 * C
+        + M2 * L2 * omega2 ** 2 * S
+        - (M1 + M2) * g * sin1
+    ) / ((M1 + M2) * L2 - M2 * L1 * C ** 2)
+    out[2] = omega2
+    out[3] = (
+        -M2 * L2 * omega2 ** 2 * S * C
+        + (M1 + M2) * g * sin1 * C
+        - (M1 + M2) * L2 * omega1 ** 2 * S
+        - (M1 + M2) * g * sin2
+    ) / ((M1 + M2) * L2 - M2 * L2 * C ** 2)
+    return out
+
+
+@jit
+def _double_pendulum_rk4_step(y, h, M1, M2, L1, L2, g):
+    """
+    One classical Runge-Kutta step of length h for a (4, N) batch of
+    states, using _double_pendulum_rhs.
+    """
+    k1 = _double_pendulum_rhs(y, M1, M2, L1, L2, g)
+    k2 = _double_pendulum_rhs(y + h / 2 * k1, M1, M2, L1, L2, g)
+    k3 = _double_pendulum_rhs(y + h / 2 * k2, M1, M2, L1, L2, g)
+    k4 = _double_pendulum_rhs(y + h * k3, M1, M2, L1, L2, g)
+    return y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+@jit
+def _double_pendulum_fixed_step(y, h, coefficients, M1, M2, L1, L2, tol, max_iter):
+    """
+    Stormer-Verlet for the double pendulum (see DoublePendulum._fixed_step),
+    composed with the substep coefficients (a tuple of floats), filling the
+    preallocated (4, len(t)) array y from its first column, one step of
+    length h per column. Returns the number of implicit half steps whose fixed point
+    iteration did not reach tol within max_iter iterations.
+    """
+    theta1, omega1 = float(y[0, 0]), float(y[1, 0])
+    theta2, omega2 = float(y[2, 0]), float(y[3, 0])
+    failed = 0
+    for i in range(1, y.shape[1]):
+        for c in coefficients:
+            s = c * h
+            w1, w2 = omega1, omega2
+            converged = False
+            for _ in range(max_iter):
+                a1, a2 = _scalar_accelerations(M1, M2, L1, L2, theta1, theta2, w1, w2)
+                n1, n2 = omega1 + s / 2 * a1, omega2 + s / 2 * a2
+                converged = abs(n1 - w1) + abs(n2 - w2) <= tol
+                w1, w2 = n1, n2
+                if converged:
+                    break
+            if not converged:
+                failed += 1
+            theta1 += s * w1
+            theta2 += s * w2
+            a1, a2 = _scalar_accelerations(M1, M2, L1, L2, theta1, theta2, w1, w2)
+            omega1, omega2 = w1 + s / 2 * a1, w2 + s / 2 * a2
+        y[0, i] = theta1
+        y[1, i] = omega1
+        y[2, i] = theta2
+        y[3, i] = omega2
+    return failed
+
+
+def _disc_offsets(radius):
+    """
+    Returns the row and column offsets of the pixels in a disc of radius
+    pixels around a center pixel.
+    """
+
+    r = int(np.ceil(radius))
+    rows, cols = np.mgrid[-r : r + 1, -r : r + 1]
+    inside = rows ** 2 + cols ** 2 <= radius ** 2
+    return rows[inside], cols[inside]
+
+
+def _paint(image, rows, cols, offsets, color):
+    """
+    Paint the pixels at rows, cols of image, each widened by offsets from
+    _disc_offsets, with color. Pixels outside the image are skipped.
+    """
+
+    rows = (np.asarray(rows)[:, None] + offsets[0]).ravel()
+    cols = (np.asarray(cols)[:, None] + offsets[1]).ravel()
+    inside = (
+        (rows >= 0) & (rows < image.shape[0]) & (cols >= 0) & (cols < image.shape[1])
+    )
+    image[rows[inside], cols[inside]] = color
+
+
+def _segment(r0, c0, r1, c1):
+    """
+    Returns the rows and columns of the pixels on the line between two
+    pixels.
+    """
+
+    n = int(max(abs(r1 - r0), abs(c1 - c0))) + 1
+    rows = np.linspace(r0, r1, n).round().astype(int)
+    cols = np.linspace(c0, c1, n).round().astype(int)
+    return rows, cols
+
+
+def _rk4_step(model):
+    """
+    Returns a function step(t, y, h) taking one classical Runge-Kutta step
+    with the right-hand side model(t, y).
+    """
+
+    def step(t, y, h):
+        k1 = np.asarray(model(t, y))
+        k2 = np.asarray(model(t + h / 2, y + h / 2 * k1))
+        k3 = np.asarray(model(t + h / 2, y + h / 2 * k2))
+        k4 = np.asarray(model(t + h, y + h * k3))
+        return y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+    return step
+
+
+def _rk4_ensemble(step, y0, t, out):
+    """
+    Integrate a batch of initial states in lockstep on the uniform time
+    grid t, where step(t, y, h) advances the whole batch y of size (4, N)
+    by one step h at once.
+
+    Parameters:
+    -----------
+    step:   callable, see _rk4_step
+    y0:     NumPy array of size (N, 4), initial states
+    t:      NumPy array of size T, uniform time grid starting at 0
+    out:    NumPy array of size (N, 4, T), filled with the solution
+    """
+
+    y = np.array(y0, dtype=float).T
+    h = t[1] - t[0] if len(t) > 1 else 0
+    # States are collected in a contiguous buffer of steps and copied to
+    # out in blocks, instead of strided writes to out at every step.
+    buffer = np.empty((min(64, len(t)),) + y.shape)
+    buffer[0] = y
+    first = 0
+    for k in range(1, len(t) + 1):
+        if k - first == len(buffer) or k == len(t):
+            out[:, :, first:k] = buffer[: k - first].transpose(2, 1, 0)
+            first = k
+        if k == len(t):
+            break
+        y = step(t[k - 1], y, h)
+        buffer[k - first] = y
+
+
+def _ensemble_worker(params, y0, t, path, start, fast):
+    """
+    Integrate one shard of DoublePendulum.solve_ensemble. If path is given,
+    the shard is written to rows start:start+len(y0) of the .npy file at path
+    and None is returned, otherwise the shard is returned.
+    """
+
+    model = DoublePendulum(*params)
+    if fast:
+        M1, L1, M2, L2 = params
+
+        def step(t, y, h):
+            return _double_pendulum_rk4_step(y, h, M1, M2, L1, L2, g)
+
+    else:
+        step = _rk4_step(model)
+
+    if path is None:
+        out = np.empty((len(y0), 4, len(t)))
+        _rk4_ensemble(step, y0, t, out)
+        return out
+    out = np.load(path, mmap_mode="r+")
+    _rk4_ensemble(step, y0, t, out[start : start + len(y0)])
+    out.flush()
+
+
+class DoublePendulum(ODEModel):
+    method = "Radau"
+    STATE = ("_theta1", "_omega1", "_theta2", "_omega2")
+    PARAMETERS = ("M1", "L1", "M2", "L2", "velocities")
+
+    def __init__(self, M1=1, L1=1, M2=1, L2=1, memoize=True, velocities="analytic"):
+        """
+        velocities: "analytic" or "gradient"
+                    default to analytic, computing the velocities and the
+                    kinetic energy from omega1 and omega2. If set to
+                    "gradient", they are found by differentiating the
+                    positions with np.gradient
+        """
+        if velocities not in ("analytic", "gradient"):
+            raise ValueError("velocities must be either analytic or gradient")
         self.M1 = M1
         self.L1 = L1
         self.M2 = M2
         self.L2 = L2
+        self.memoize = memoize
+        self.velocities = velocities
 
     def __call__(self, t, y):
         """
@@ -67,7 +305,106 @@ class DoublePendulum:
             domega2_dt(self.M1, self.M2, self.L1, self.L2, y[0], y[2], y[1], y[3]),
         )
 
-    def solve(self, y0, T, dt, angles="rad"):
+    def jac(self, t, y):
+        """
+        Returns the Jacobian of the right-hand side with respect to
+        theta1, omega1, theta2, omega2, as a NumPy array of size (4, 4).
+        Each angular acceleration is a quotient num/den of functions of
+        theta1, theta2 and delta = theta2 - theta1, differentiated with the
+        quotient and chain rules.
+        """
+        M1, M2, L1, L2 = self.M1, self.M2, self.L1, self.L2
+        theta1, omega1, theta2, omega2 = y
+        d = delta(theta1, theta2)
+        S, C = np.sin(d), np.cos(d)
+        f1 = domega1_dt(M1, M2, L1, L2, theta1, theta2, omega1, omega2)
+        f2 = domega2_dt(M1, M2, L1, L2, theta1, theta2, omega1, omega2)
+        den1 = (M1 + M2) * L2 - M2 * L1 * C ** 2
+        den2 = (M1 + M2) * L2 - M2 * L2 * C ** 2
+
+        dnum1_dd = (
+            M2 * L1 * omega1 ** 2 * (C ** 2 - S ** 2)
+            - M2 * g * np.sin(theta2) * S
+            + M2 * L2 * omega2 ** 2 * C
+        )
+        df1_dd = (dnum1_dd - f1 * 2 * M2 * L1 * C * S) / den1
+        df1_dtheta1 = -df1_dd - (M1 + M2) * g * np.cos(theta1) / den1
+        df1_dtheta2 = df1_dd + M2 * g * np.cos(theta2) * C / den1
+        df1_domega1 = 2 * M2 * L1 * omega1 * S * C / den1
+        df1_domega2 = 2 * M2 * L2 * omega2 * S / den1
+
+        dnum2_dd = (
+            -M2 * L2 * omega2 ** 2 * (C ** 2 - S ** 2)
+            - (M1 + M2) * g * np.sin(theta1) * S
+            - (M1 + M2) * L2 * omega1 ** 2 * C
+        )
+        df2_dd = (dnum2_dd - f2 * 2 * M2 * L2 * C * S) / den2
+        df2_dtheta1 = -df2_dd + (M1 + M2) * g * np.cos(theta1) * C / den2
+        df2_dtheta2 = df2_dd - (M1 + M2) * g * np.cos(theta2) / den2
+        df2_domega1 = -2 * (M1 + M2) * L2 * omega1 * S / den2
+        df2_domega2 = -2 * M2 * L2 * omega2 * S * C / den2
+
+        return np.array(
+            [
+                [0, 1, 0, 0],
+                [df1_dtheta1, df1_domega1, df1_dtheta2, df1_domega2],
+                [0, 0, 0, 1],
+                [df2_dtheta1, df2_domega1, df2_dtheta2, df2_domega2],
+            ]
+        )
+
+    def _fast_rhs(self):
+        """
+        Returns the right-hand side f(t, y) as the compiled
+        _double_pendulum_rhs with the parameters bound.
+        """
+        params = (self.M1, self.M2, self.L1, self.L2, g)
+        return lambda t, y: _double_pendulum_rhs(y, *params)
+
+    def _fixed_step(self, y0, t, method, tol=1e-14, max_iter=50):
+        """
+        Fixed step integration with the Stormer-Verlet scheme for velocity
+        dependent forces ("verlet", second order),
+
+            w(n+1/2) = w(n) + h/2 a(theta(n), w(n+1/2)),
+            theta(n+1) = theta(n) + h w(n+1/2),
+            w(n+1) = w(n+1/2) + h/2 a(theta(n+1), w(n+1/2)),
+
+        or its Yoshida composition ("yoshida4", fourth order), with
+        _double_pendulum_fixed_step (compiled with Numba if installed).
+        The implicit half step is
+        solved by fixed point iteration, and a RuntimeWarning is issued if
+        it does not converge to tol within max_iter iterations, typically
+        because dt is too large. The angular accelerations depend on the
+        angular velocities, so the scheme is not symplectic in these
+        variables, but it is time reversible, which likewise keeps the
+        energy error bounded instead of drifting.
+        """
+        h = float(t[1] - t[0]) if len(t) > 1 else 0.0
+        coefficients = (1.0,) if method == "verlet" else YOSHIDA4
+        y = np.empty((4, len(t)))
+        y[:, 0] = y0
+        params = (self.M1, self.M2, self.L1, self.L2)
+        failed = _double_pendulum_fixed_step(
+            y, h, coefficients, *params, tol, max_iter
+        )
+        if failed:
+            warnings.warn(
+                f"Fixed point iteration of {method} did not converge to "
+                f"tol={tol} in {failed} half steps, consider a smaller dt",
+                RuntimeWarning,
+            )
+        return y
+
+    def solve(self, y0, T, dt, angles="rad", **options):
+        """
+        Solve the initial value problem with a single integration, by default
+        using the implicit Radau method with the analytic Jacobian jac.
+        Options method, rtol, atol, dense_output, jac, fast, lazy and cache
+        are passed on to ODEModel._integrate. method may also be "verlet" or
+        "yoshida4" for reversible fixed step integration, stepping dt at a
+        time.
+        """
         if angles == "deg":
             y0[0] = (y0[0] * 180) / np.pi
         elif angles != "deg" and angles != "rad":
@@ -76,14 +413,61 @@ class DoublePendulum:
         if not len(y0) == 4:
             raise IndexError("Initial condition y0 must be of length 4!")
 
+        self._integrate(y0, T, dt, **options)
+
+    def solve_ensemble(self, y0, T, dt, workers=1, path=None, fast=False):
+        """
+        Solve the initial value problem for a whole batch of initial
+        conditions at once, using fixed step RK4 in lockstep across the
+        batch. The solution is returned rather than stored in the instance.
+
+        Parameters:
+        -----------
+        y0:         arraylike of size (N, 4), initial conditions
+                    in order theta1, omega1, theta2, omega2
+        T:          float, end point of integration
+        dt:         float, time step
+        workers:    int, number of processes the batch is split between.
+                    Default is 1, integrating in this process
+        path:       str or None. If given, the solution is streamed to an .npy
+                    file at path and returned as a read-only memory map
+        fast:       bool, if True each step is taken by the compiled
+                    _double_pendulum_rk4_step instead of calling __call__
+
+        Returns:
+        --------
+        t:          NumPy array of size T/dt + 1, time points
+        Y:          NumPy array of size (N, 4, T/dt + 1), the solutions
+        """
+        y0 = np.array(y0, dtype=float)
+        if y0.ndim != 2 or y0.shape[1] != 4:
+            raise IndexError("Initial conditions y0 must be of size (N, 4)!")
+
         t = np.linspace(0, T, int(T / dt + 1))
-        self._t, self._theta1, self._omega1, self._theta2, self._omega2 = (
-            integrate.solve_ivp(self, [0, T], y0, method="Radau", t_eval=t).t,
-            integrate.solve_ivp(self, [0, T], y0, method="Radau", t_eval=t).y[0],
-            integrate.solve_ivp(self, [0, T], y0, method="Radau", t_eval=t).y[1],
-            integrate.solve_ivp(self, [0, T], y0, method="Radau", t_eval=t).y[2],
-            integrate.solve_ivp(self, [0, T], y0, method="Radau", t_eval=t).y[3],
-        )
+        params = (self.M1, self.L1, self.M2, self.L2)
+        if path is not None:
+            np.lib.format.open_memmap(
+                path, mode="w+", shape=(len(y0), 4, len(t))
+            ).flush()
+
+        bounds = np.linspace(0, len(y0), max(1, int(workers)) + 1).astype(int)
+        shards = [(y0[a:b], a) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        if workers > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+                results = list(
+                    pool.map(
+                        _ensemble_worker,
+                        *zip(*[(params, y, t, path, a, fast) for y, a in shards]),
+                    )
+                )
+        else:
+            results = [
+                _ensemble_worker(params, y, t, path, a, fast) for y, a in shards
+            ]
+
+        if path is not None:
+            return t, np.load(path, mmap_mode="r")
+        return t, np.concatenate(results)
 
     @property
     def theta1(self):
@@ -93,55 +477,81 @@ class DoublePendulum:
     def theta2(self):
         return self._theta2
 
+    @property
+    def omega1(self):
+        return self._omega1
+
+    @property
+    def omega2(self):
+        return self._omega2
+
     @property
     def t(self):
         return self._t
 
-    @property
+    @derived
     def x1(self):
         return self.L1 * np.sin(self.theta1)
 
-    @property
+    @derived
     def y1(self):
         return -self.L1 * np.cos(self.theta1)
 
-    @property
+    @derived
     def x2(self):
         return self.x1 + self.L2 * np.sin(self.theta2)
 
-    @property
+    @derived
     def y2(self):
         return self.y1 - self.L2 * np.cos(self.theta2)
 
-    @property
+    @derived
     def potential(self):
         P1 = self.M1 * g * (self.y1 + self.L1)
         P2 = self.M2 * g * (self.y2 + self.L1 + self.L2)
         return P1 + P2
 
-    @property
+    @derived
     def vx1(self):
-        return np.gradient(self.x1, self.t)
+        if self.velocities == "gradient":
+            return np.gradient(self.x1, self.t)
+        return self.L1 * self.omega1 * np.cos(self.theta1)
 
-    @property
+    @derived
     def vy1(self):
-        return np.gradient(self.y1, self.t)
+        if self.velocities == "gradient":
+            return np.gradient(self.y1, self.t)
+        return self.L1 * self.omega1 * np.sin(self.theta1)
 
-    @property
+    @derived
     def vx2(self):
-        return np.gradient(self.x2, self.t)
+        if self.velocities == "gradient":
+            return np.gradient(self.x2, self.t)
+        return self.vx1 + self.L2 * self.omega2 * np.cos(self.theta2)
 
-    @property
+    @derived
     def vy2(self):
-        return np.gradient(self.y2, self.t)
+        if self.velocities == "gradient":
+            return np.gradient(self.y2, self.t)
+        return self.vy1 + self.L2 * self.omega2 * np.sin(self.theta2)
 
-    @property
+    @derived
     def kinetic(self):
-        K1 = 0.5 * self.M1 * (self.vx1 ** 2 + self.vy1 ** 2)
-        K2 = 0.5 * self.M2 * (self.vx2 ** 2 + self.vy2 ** 2)
-        return K1 + K2
+        if self.velocities == "gradient":
+            K1 = 0.5 * self.M1 * (self.vx1 ** 2 + self.vy1 ** 2)
+            K2 = 0.5 * self.M2 * (self.vx2 ** 2 + self.vy2 ** 2)
+            return K1 + K2
+        # |v2|^2 = |v1|^2 + (L2 omega2)^2 + 2 L1 L2 omega1 omega2 cos(theta1 - theta2)
+        w1 = self.L1 * self.omega1
+        w2 = self.L2 * self.omega2
+        cross = w1 * w2 * np.cos(self.theta1 - self.theta2)
+        return 0.5 * (self.M1 + self.M2) * w1 ** 2 + self.M2 * (0.5 * w2 ** 2 + cross)
 
     def create_animation(self):
+        """
+        Create a blitted matplotlib animation with one frame per time point
+        of the solution, played back in real time.
+        """
         fig = plt.figure()
 
         plt.axis("equal")
@@ -149,30 +559,104 @@ class DoublePendulum:
         plt.axis((-3, 3, -3, 3))
 
         (self.pendulums,) = plt.plot([], [], "o-", lw=2)
+        self._coordinates = np.array([self.x1, self.y1, self.x2, self.y2])
 
         self.animation = animation.FuncAnimation(
             fig,
             self._next_frame,
-            interval=100,
-            frames=600,
+            interval=1000 * self._grid_step(),
+            frames=self._coordinates.shape[1],
             repeat=None,
             blit=True,
         )
 
     def _next_frame(self, i):
-        self.pendulums.set_data(
-            (0, self.x1[i], self.x2[i]), (0, self.y1[i], self.y2[i])
-        )
+        x1, y1, x2, y2 = self._coordinates[:, i]
+        self.pendulums.set_data((0, x1, x2), (0, y1, y2))
         return (self.pendulums,)
 
     def show_animation(self):
         self.create_animation()
         plt.show()
 
-    def save_animation(self, filename):
-        self.create_animation()
-        self.animation.save(filename + ".mp4", fps=60)
+    def frames(self, size=480, chunk_size=1000):
+        """
+        Render the motion as RGB images of size (size, size, 3), one per time
+        point of the solution, without matplotlib. The coordinates are
+        computed a chunk of frames at a time, and after a lazy solve they are
+        streamed from the dense output with iter_chunks.
 
+        The same array is filled and yielded for every frame, copy it to keep
+        a frame.
+        """
+        half_width = 1.1 * (self.L1 + self.L2)
+        scale = (size - 1) / (2 * half_width)
+        rod = _disc_offsets(1.5)
+        bob = _disc_offsets(size / 60)
+        origin = (size - 1) // 2
+
+        if self._grid is not None:
+            chunks = self.iter_chunks(chunk_size=chunk_size)
+        else:
+            chunks = [self]
+        image = np.empty((size, size, 3), dtype=np.uint8)
+        for chunk in chunks:
+            cols = np.rint(origin + scale * np.array([chunk.x1, chunk.x2]))
+            rows = np.rint(origin - scale * np.array([chunk.y1, chunk.y2]))
+            cols, rows = cols.astype(int), rows.astype(int)
+            for c1, c2, r1, r2 in zip(*cols, *rows):
+                image.fill(255)
+                _paint(image, *_segment(origin, origin, r1, c1), rod, 0)
+                _paint(image, *_segment(r1, c1, r2, c2), rod, 0)
+                _paint(image, [r1], [c1], bob, (31, 119, 180))
+                _paint(image, [r2], [c2], bob, (255, 127, 14))
+                yield image
+
+    def save_animation(self, filename, fps=None, size=480, encoder="ffmpeg"):
+        """
+        Save the animation as filename.mp4. The frames from frames are piped
+        as raw RGB data into an encoder process, which encodes them while the
+        next frames are rendered.
+
+        Parameters:
+        -----------
+        filename:   str, name of the file, without extension
+        fps:        frames per second. Default is None, playing back the
+                    solution in real time
+        size:       int, width and height of the video in pixels
+        encoder:    str, name or path of the ffmpeg executable
+        """
+        if shutil.which(encoder) is None:
+            raise FileNotFoundError(f"Could not find the encoder {encoder}")
+        if fps is None:
+            fps = 1 / self._grid_step()
+        size += size % 2
+
+        command = [
+            encoder,
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-s",
+            f"{size}x{size}",
+            "-r",
+            f"{fps:g}",
+            "-i",
+            "-",
+            "-pix_fmt",
+            "yuv420p",
+            filename + ".mp4",
+        ]
+        with subprocess.Popen(command, stdin=subprocess.PIPE) as encoding:
+            for frame in self.frames(size):
+                encoding.stdin.write(frame.tobytes())
+            encoding.stdin.close()
+            if encoding.wait() != 0:
+                raise RuntimeError(f"{encoder} failed to encode {filename}.mp4")
 
 if __name__ == "__main__":
     p_double = DoublePendulum(M1=2.5, L1=1, M2=0.4, L2=1)
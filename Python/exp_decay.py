@@ -1,29 +1,97 @@
-from scipy import integrate
 import numpy as np
 import matplotlib.pyplot as plt
+from ode_model import ODEModel, _result
 
 
-class ExponentialDecay:
+class ExponentialDecay(ODEModel):
+    STATE = ("_u",)
+    PARAMETERS = ("a",)
+
     def __init__(self, a):
         self.a = a
 
     def __call__(self, t, u):
         return -self.a * u
 
-    def solve(self, u0, T, dt):
+    def solve(self, u0, T, dt, **options):
+        """
+        Solve the initial value problem with a single integration. Options
+        method, rtol, atol, dense_output and cache are passed on to
+        ODEModel._integrate. Returns the time points t and the solution u.
+
+        With method="exact", the exact solution is evaluated instead, see
+        exact, and stored like any other solution. This requires a scalar
+        decay rate a and u0; use exact directly for arrays.
+        """
+        if options.get("method") == "exact":
+            return self._solve_exact(u0, T, dt, options.get("cache"))
+        solution = self._integrate([u0], T, dt, **options)
+        return solution.t, solution.y[0]
+
+    def _solve_exact(self, u0, T, dt, cache=None):
+        """
+        Evaluate and store the exact solution of a single problem, looked
+        up in and stored to cache if given.
+        """
+        if np.ndim(self.a) or np.ndim(u0):
+            raise ValueError("method exact takes a scalar a and u0, use exact")
+        key = entry = None
+        if cache is not None:
+            key = self._cache_key([u0], T, dt, "exact", 0, 0, False, False)
+            entry = cache.get(key)
+        if entry is None:
+            t, u = self.exact(u0, T, dt)
+            entry = (t, u[None])
+            if key is not None:
+                cache.put(key, *entry)
+        self.solution = _result(*entry, "Exact solution evaluated.")
+        self._store(*entry)
+        return entry[0], entry[1][0]
+
+    def exact(self, u0, T, dt):
+        """
+        Evaluate the exact solution u = u0 exp(-a t) on the time grid of
+        solve. The decay rate a and u0 may be arrays, and are broadcast
+        against each other, so a whole family of problems is evaluated in
+        one call. The solution is returned, not stored in the instance.
+
+        Parameters:
+        ----------
+        u0:     float, arraylike, initial values
+        T:      float, end point
+        dt:     float, time discretization
+
+        Returns:
+        --------
+        t:      NumPy array of size T/dt + 1, time points
+        u:      NumPy array of size np.broadcast(a, u0).shape + (len(t),),
+                e.g. (len(a), len(t)) for an array of decay rates
+        """
         t = np.linspace(0, T, int(T / dt + 1))
-        t, u = (
-            integrate.solve_ivp(self, [0, T], [u0], t_eval=t).t,
-            integrate.solve_ivp(self, [0, T], [u0], t_eval=t).y[0],
-        )
+        a = np.asarray(self.a, dtype=float)[..., None]
+        u0 = np.asarray(u0, dtype=float)[..., None]
+        u = np.multiply(a, -t)
+        np.exp(u, out=u)
+        if np.broadcast_shapes(u.shape, u0.shape) == u.shape:
+            u *= u0
+        else:
+            u = u * u0
         return t, u
 
+    @property
+    def t(self):
+        return self._t
+
+    @property
+    def u(self):
+        return self._u
+
 
 if __name__ == "__main__":
-    for a in [0.1, 0.4, 0.8]:
-        decay_model = ExponentialDecay(a)
-        t, u = decay_model.solve(5, 10, 0.1)
-        plt.plot(t, u, label=f"a = {a}")
+    rates = [0.1, 0.4, 0.8]
+    t, u = ExponentialDecay(rates).exact(5, 10, 0.1)
+    for a, u_a in zip(rates, u):
+        plt.plot(t, u_a, label=f"a = {a}")
     plt.xlabel("t")
     plt.ylabel("u")
     plt.title("Exponential decay models for different values of a")
@@ -1,5 +1,140 @@
+import itertools
 import numpy as np
 import matplotlib.pyplot as plt
+from raster import Rasterizer
+from sampling import AliasSampler
+
+
+class IFS:
+    """
+    Vectorized engine for iterated function systems of k affine maps
+
+    f_j(x, y) = (a*x + b*y + e, c*x + d*y + f),
+
+    given as a stacked coefficient array of size (k, 2, 3) with rows
+    [[a, b, e], [c, d, f]], where map j is used with probability prob[j].
+
+    The maps are drawn with an AliasSampler built once per IFS. Instead of
+    following one point through all the iterations, a batch of walkers is
+    iterated side by side, so each iteration is a handful of array
+    operations over all walkers. Every walker starts in the fixed point of
+    the first map, which lies on the attractor, and runs a burn-in before its
+    points are recorded, so the walkers do not trace out the same points.
+    """
+
+    def __init__(self, coefficients, prob):
+        """
+        Parameters
+        ----------
+        coefficients:   arraylike of size (k, 2, 3)
+        prob:           arraylike of size k, probability of each map
+        """
+        self.coefficients = np.array(coefficients, dtype=float)
+        self.prob = np.array(prob, dtype=float)
+        k = len(self.coefficients)
+        if self.coefficients.shape != (k, 2, 3) or self.prob.shape != (k,):
+            raise ValueError(
+                "coefficients must be of size (k, 2, 3) and prob of size k!"
+            )
+        if np.any(self.prob < 0) or abs(self.prob.sum() - 1) > 1e-12:
+            raise ValueError("prob must be non-negative and sum to 1!")
+        self._sampler = AliasSampler(self.prob)
+
+    @classmethod
+    def from_transforms(cls, transforms, prob):
+        """
+        Enables initialization using a list of AffineTransform instances.
+        """
+        return cls([f.matrix for f in transforms], prob)
+
+    def fixed_point(self, j=0):
+        """
+        Returns the fixed point of map j, solving (I - A) x = b.
+        """
+        A, b = self.coefficients[j, :, :2], self.coefficients[j, :, 2]
+        return np.linalg.solve(np.eye(2) - A, b)
+
+    def iterate(self, N, walkers=4096, discard=50, rng=None, dtype=None):
+        """
+        Generate N points on the attractor.
+
+        Parameters
+        ----------
+        N:          int, number of points
+        walkers:    int, number of points iterated side by side. Default
+                    is 4096
+        discard:    int, number of burn-in iterations of each walker.
+                    Default is 50
+        rng:        numpy.random.Generator to draw from. Default is None,
+                    using the global random state
+        dtype:      floating point type of the returned points, e.g.
+                    np.float32 to halve the memory. The walkers are always
+                    iterated in float64. Default is None, float64
+
+        Returns
+        -------
+        X:          NumPy array of size (N, 2)
+        """
+        X = np.empty((N, 2), dtype=dtype)
+        done = 0
+        for points in self.iterate_chunks(N, 2 ** 20, walkers, discard, rng, dtype):
+            X[done : done + len(points)] = points
+            done += len(points)
+        return X
+
+    def iterate_chunks(
+        self,
+        N,
+        chunk_size=2 ** 20,
+        walkers=4096,
+        discard=50,
+        rng=None,
+        dtype=None,
+        growth=1,
+    ):
+        """
+        Generator version of iterate, yielding the N points in blocks of
+        about chunk_size points, i.e. whole iterations of all the walkers.
+        The maps are drawn one block at a time, so only O(chunk_size) memory
+        is in use apart from the points yielded.
+
+        Parameters
+        ----------
+        N:          int, number of points
+        chunk_size: int, number of points per block, rounded down to a
+                    multiple of walkers. Default is 2**20
+        walkers, discard, rng, dtype:
+                    see iterate
+        growth:     float >= 1, factor the block size grows by after each
+                    block. Default is 1, blocks of equal size
+
+        Yields
+        -------
+        X:          NumPy array of size (m, 2), points of the block
+        """
+        if growth < 1:
+            raise ValueError("growth must be at least 1!")
+        W = max(1, min(int(walkers), N))
+        T = -(-N // W)
+
+        C = self.coefficients.reshape(-1, 6)
+        x0, y0 = self.fixed_point()
+        x, y = np.full(W, x0), np.full(W, y0)
+        t = -discard
+        while t < T:
+            first = max(t, 0)
+            stop = min(T, first + max(1, int(chunk_size) // W))
+            X = np.empty((stop - first, W, 2), dtype=dtype)
+            for s in self._sampler.sample((stop - t, W), rng):
+                a, b, e, c, d, f = C[s].T
+                x, y = a * x + b * y + e, c * x + d * y + f
+                if t >= 0:
+                    X[t - first, :, 0] = x
+                    X[t - first, :, 1] = y
+                t += 1
+            yield X.reshape(-1, 2)[: N - first * W]
+            chunk_size *= growth
+
 
 class AffineTransform:
     """
@@ -7,6 +142,8 @@ class AffineTransform:
     them through affine functions.
     """
 
+    prob = [0.01, 0.85, 0.07, 0.07]
+
     def __init__(self, a=0, b=0, c=0, d=0, e=0, f=0):
         self.a, self.b, self.c, self.d, self.e, self.f = a, b, c, d, e, f
 
@@ -14,6 +151,13 @@ class AffineTransform:
         a, b, c, d, e, f = self.a, self.b, self.c, self.d, self.e, self.f
         return [a*x + b*y + e, c*x + d*y + f]
 
+    @property
+    def matrix(self):
+        """
+        Returns the coefficients as a NumPy array [[a, b, e], [c, d, f]].
+        """
+        return np.array([[self.a, self.b, self.e], [self.c, self.d, self.f]])
+
     def functions(self):
         f1 = AffineTransform(d=0.16)
         f2 = AffineTransform(a=0.85, b=0.04, c=-0.04, d=0.85, f=1.6)
@@ -30,7 +174,7 @@ class AffineTransform:
         -------
         func[j]:    The drawn function based on the list of probabilities.
         """
-        prob = [0.01, 0.85, 0.07, 0.07]
+        prob = self.prob
         func = self.functions()
         p_cumulative = np.cumsum(prob)
         r = np.random.random()
@@ -38,16 +182,73 @@ class AffineTransform:
             if r < p:
                 return func[j]
 
-    def iterating(self):
-        X = np.zeros((50000,2))
-        for i in range(49999):
-            choice = self.weighted_choice()
-            X[i+1, 0] = choice(X[i, 0], X[i, 1])[0]
-            X[i+1, 1] = choice(X[i, 0], X[i, 1])[1]
-        return X
+    def iterating(self, N=50000, rng=None, dtype=None):
+        """
+        Generate N points of the Barnsley fern with the vectorized IFS engine.
+
+        Parameters
+        ----------
+        N:      int, number of points. Default is 50000
+        rng:    numpy.random.Generator to draw from. Default is None,
+                using the global random state
+        dtype:  floating point type of the points, see IFS.iterate
+
+        Returns
+        -------
+        X:      NumPy array of size (N, 2)
+        """
+        ifs = IFS.from_transforms(self.functions(), self.prob)
+        return ifs.iterate(N, rng=rng, dtype=dtype)
 
-    def plot(self):
+    def show_progressive(
+        self, N=10 ** 8, tol=0.05, batch=10 ** 4, growth=2, resolution=1000, rng=None
+    ):
+        """
+        Interactive preview of the fern, drawing its density image after
+        each of a sequence of growing batches of points, until the image
+        converges (see Rasterizer.refine) or N points are generated. The
+        extent of the image is fitted to the first batch.
+
+        Parameters
+        ----------
+        N:          int, maximum number of points
+        tol:        float, convergence threshold, see Rasterizer.refine
+        batch:      int, number of points in the first batch
+        growth:     float, factor each batch grows by
+        resolution: int, number of pixels along the x-axis
+        rng:        numpy.random.Generator to draw from. Default is None,
+                    using the global random state
+
+        Returns
+        -------
+        raster:     Rasterizer holding the points generated
+        """
+        ifs = IFS.from_transforms(self.functions(), self.prob)
+        batches = ifs.iterate_chunks(N, batch, rng=rng, growth=growth)
+        first = next(batches)
+        raster = Rasterizer.from_points(first, resolution=resolution, margin=0.05)
+        raster = raster.empty_copy()
+
+        fig, ax = plt.subplots()
+        ax.axis("equal")
+        ax.axis("off")
+        batches = itertools.chain([first], batches)
+        raster.refine(batches, tol, ax=ax, color="forestgreen")
+        plt.show()
+        return raster
+
+    def plot(self, raster=False):
+        """
+        Plot the fern and save it to figures/barnsley_fern.png. If raster is
+        True, the points are binned into a density image which is written
+        directly, instead of scattering every point.
+        """
         list = self.iterating()
+        if raster:
+            raster = Rasterizer.from_points(list)
+            raster.savepng("figures/barnsley_fern.png", color="forestgreen")
+            return
+
         fig, ax = plt.subplots()
         ax.scatter(*zip(*list), color="forestgreen", s=0.2)
         ax.axis("equal")
@@ -0,0 +1,390 @@
+import copy
+import functools
+import hashlib
+import os
+import numpy as np
+from scipy import integrate
+from scipy.optimize import OptimizeResult
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Triple jump composition of a symmetric second order step into a fourth
+# order step (Yoshida, 1990).
+YOSHIDA4 = (
+    1 / (2 - 2 ** (1 / 3)),
+    -(2 ** (1 / 3)) / (2 - 2 ** (1 / 3)),
+    1 / (2 - 2 ** (1 / 3)),
+)
+
+
+def jit(func):
+    """
+    Decorator compiling func with numba.njit if Numba is installed. Without
+    Numba, func is returned unchanged and runs as plain NumPy code, so the
+    decorated functions must only use features supported by both.
+    """
+
+    if njit is None:
+        return func
+    return njit(cache=True)(func)
+
+
+def derived(func):
+    """
+    Decorator for quantities derived from the solution of an ODE model,
+    e.g. positions, velocities and energies.
+
+    The decorated method becomes a property which, if the instance has
+    memoize set to True, is computed once and cached as a read-only array
+    until the cache is cleared. Instances of DerivedCache clear the cache
+    whenever an attribute is set, i.e. when solve stores a new solution or
+    a parameter is changed.
+    """
+
+    name = func.__name__
+
+    @functools.wraps(func)
+    def getter(self):
+        if not self.memoize:
+            return func(self)
+        cache = self.__dict__.setdefault("_derived", {})
+        if name not in cache:
+            value = func(self)
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            cache[name] = value
+        return cache[name]
+
+    return property(getter)
+
+
+def _result(t, y, message):
+    """
+    Returns an OdeResult-like object for a solution y at the times t not
+    found by solve_ivp, without a dense interpolant.
+    """
+
+    return OptimizeResult(
+        t=t,
+        y=y,
+        sol=None,
+        t_events=None,
+        y_events=None,
+        nfev=0,
+        njev=0,
+        nlu=0,
+        status=0,
+        message=message,
+        success=True,
+    )
+
+
+class DerivedCache:
+    """
+    Mixin holding the cache of the properties decorated with derived.
+    Setting memoize to False turns the cache off, to save memory.
+    """
+
+    memoize = True
+
+    def __setattr__(self, name, value):
+        self.clear_cache()
+        super().__setattr__(name, value)
+
+    def clear_cache(self):
+        """
+        Drop all cached derived quantities.
+        """
+        self.__dict__.pop("_derived", None)
+
+
+class ODEModel(DerivedCache):
+    """
+    Base class for models given as the right-hand side of an ODE
+    u' = f(t, u), implemented by __call__.
+
+    The model is integrated once per solve with scipy.integrate.solve_ivp,
+    and the full OdeResult is stored, so subclasses read every component
+    of the solution from the same integration.
+
+    Subclasses may implement jac(t, y), returning the Jacobian of the
+    right-hand side, which is then passed on to the implicit methods.
+
+    Subclasses may implement _fast_rhs(), returning a function f(t, y)
+    evaluating the right-hand side as a NumPy array without the overhead of
+    __call__, which is used by solve_ivp when solving with fast=True.
+
+    Subclasses may also implement _fixed_step(y0, t, method), integrating
+    with one of the FIXED_STEP_METHODS on the uniform grid t and returning
+    the solution as an array of size (len(y0), len(t)), which is used
+    instead of solve_ivp for those methods. _fixed_step should step with a
+    function decorated with jit (compiled with Numba if installed), used
+    with or without fast=True.
+
+    The solution on the time grid is stored as the attribute _t and the
+    attributes named in STATE, one per component. With lazy=True only the
+    dense interpolant of the solver is kept, and the grid is evaluated the
+    first time one of these attributes is read. Use at and iter_chunks to
+    evaluate the solution at other times or a chunk at a time.
+
+    The names in PARAMETERS are the arguments of __init__ stored as
+    attributes, which are saved next to the solution by save, so load can
+    recreate the model.
+    """
+
+    method = "RK45"
+    STATE = ()
+    PARAMETERS = ()
+    IMPLICIT_METHODS = ("Radau", "BDF", "LSODA")
+    FIXED_STEP_METHODS = ("verlet", "yoshida4")
+
+    def _integrate(
+        self,
+        y0,
+        T,
+        dt,
+        method=None,
+        rtol=1e-3,
+        atol=1e-6,
+        dense_output=False,
+        jac=True,
+        fast=False,
+        lazy=False,
+        cache=None,
+    ):
+        """
+        Integrate from t = 0 to T and evaluate the solution at the points
+        np.linspace(0, T, int(T / dt + 1)).
+
+        Parameters:
+        ----------
+        y0:             arraylike, initial conditions
+        T:              float, end point of integration
+        dt:             float, time discretization
+        method:         integration method passed on to solve_ivp, or one of
+                        FIXED_STEP_METHODS. Default is None, using the
+                        method of the class
+        rtol, atol:     relative and absolute tolerances of solve_ivp
+        dense_output:   bool, if True the solution also stores a continuous
+                        interpolant, see scipy.integrate.solve_ivp
+        jac:            bool, if True (default) and the model implements jac,
+                        the analytic Jacobian is used by implicit methods.
+                        If False, solve_ivp estimates it by finite differences
+        fast:           bool, if True the right-hand side from _fast_rhs is
+                        used instead of __call__. The FIXED_STEP_METHODS
+                        always step with kernels decorated with jit
+                        (compiled with Numba if installed), so for them
+                        fast makes no difference
+        lazy:           bool, if True the solution is not evaluated on the
+                        time grid, only the dense interpolant is stored
+        cache:          SolutionCache or None. If given, the solution on the
+                        time grid is looked up in and stored to the cache.
+                        Ignored with dense_output or lazy, as the
+                        interpolant is not cached
+
+        Returns:
+        --------
+        solution:       OdeResult, also stored as self.solution
+        """
+        method = self.method if method is None else method
+        dense_output = dense_output or lazy
+        key = None
+        if cache is not None and not dense_output:
+            key = self._cache_key(y0, T, dt, method, rtol, atol, jac, fast)
+            entry = cache.get(key)
+            if entry is not None:
+                self.solution = _result(*entry, "Solution loaded from cache.")
+                self._store(*entry)
+                return self.solution
+
+        if method in self.FIXED_STEP_METHODS:
+            self._integrate_fixed_step(y0, T, dt, method, dense_output)
+        else:
+            t = None if lazy else np.linspace(0, T, int(T / dt + 1))
+            self._integrate_ivp(y0, T, t, method, rtol, atol, dense_output, jac, fast)
+
+        if lazy:
+            for name in ("_t",) + self.STATE:
+                self.__dict__.pop(name, None)
+            self._grid = (T, dt)
+        else:
+            self._store(self.solution.t, self.solution.y)
+            if key is not None:
+                cache.put(key, self.solution.t, self.solution.y)
+        return self.solution
+
+    def _integrate_ivp(self, y0, T, t, method, rtol, atol, dense_output, jac, fast):
+        """
+        Integrate with scipy.integrate.solve_ivp, evaluating the solution at
+        the times t (None for the solver's own steps), and store the
+        OdeResult.
+        """
+        if fast and not hasattr(self, "_fast_rhs"):
+            raise ValueError("No fast right-hand side available for this model")
+        fun = self._fast_rhs() if fast else self
+
+        options = {}
+        if jac and method in self.IMPLICIT_METHODS and hasattr(self, "jac"):
+            options["jac"] = self.jac
+
+        self.solution = integrate.solve_ivp(
+            fun,
+            [0, T],
+            y0,
+            method=method,
+            t_eval=t,
+            rtol=rtol,
+            atol=atol,
+            dense_output=dense_output,
+            **options,
+        )
+        return self.solution
+
+    def _cache_key(self, y0, T, dt, method, rtol, atol, jac, fast):
+        """
+        Returns the key of a solve in a SolutionCache, a hash of the model
+        class, its PARAMETERS, the initial state y0, the time grid and the
+        solver options.
+        """
+        cls = type(self)
+        parameters = tuple((name, getattr(self, name)) for name in self.PARAMETERS)
+        # fast does not change the solution of the fixed step methods
+        fast = bool(fast) or method in self.FIXED_STEP_METHODS
+        options = (method, float(rtol), float(atol), bool(jac), fast)
+        grid = (float(T), float(dt))
+        description = (cls.__module__, cls.__qualname__, parameters, grid, options)
+        digest = hashlib.sha256(repr(description).encode())
+        digest.update(np.asarray(y0, dtype=float).tobytes())
+        return digest.hexdigest()
+
+    def _integrate_fixed_step(self, y0, T, dt, method, dense_output):
+        """
+        Integrate with _fixed_step, taking one step of length dt per time
+        point, and store the solution as an OdeResult-like object.
+        """
+        if not hasattr(self, "_fixed_step"):
+            raise ValueError(f"Method {method} is not available for this model")
+        if dense_output:
+            raise ValueError("dense_output is not available for fixed step methods")
+
+        t = np.linspace(0, T, int(T / dt + 1))
+        y = self._fixed_step(np.array(y0, dtype=float), t, method)
+        self.solution = _result(t, y, f"Fixed step {method} integration finished.")
+        return self.solution
+
+    def _store(self, t, y):
+        """
+        Store the solution y at the times t, and forget any lazy time grid.
+        """
+        self._grid = None
+        self._t = t
+        for name, component in zip(self.STATE, y):
+            setattr(self, name, component)
+
+    def __getattr__(self, name):
+        # Only called for missing attributes, i.e. the solution on the time
+        # grid after a lazy solve, which is evaluated here on first access.
+        grid = self.__dict__.get("_grid")
+        if grid is None or name not in ("_t",) + self.STATE:
+            raise AttributeError(name)
+        T, dt = grid
+        t = np.linspace(0, T, int(T / dt + 1))
+        self._store(t, self.solution.sol(t))
+        return self.__dict__[name]
+
+    def _grid_step(self):
+        """
+        Returns dt of the time grid of the last solve.
+        """
+        if self._grid is not None:
+            return self._grid[1]
+        return self._t[1] - self._t[0] if len(self._t) > 1 else 0
+
+    def at(self, t):
+        """
+        Returns a copy of the model holding the solution at the times t
+        instead of the time grid, so every property (positions, energies,
+        ...) is evaluated at t only. Requires a solve with lazy=True or
+        dense_output=True.
+
+        Parameters:
+        ----------
+        t:      float, arraylike
+                times between 0 and T
+        """
+        if getattr(self.solution, "sol", None) is None:
+            raise ValueError("Solve with lazy=True or dense_output=True first")
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        view = copy.copy(self)
+        view._store(t, self.solution.sol(t))
+        return view
+
+    def iter_chunks(self, dt=None, chunk_size=1000):
+        """
+        Stream the solution at fixed time steps from 0 to T without
+        allocating the whole time grid, yielding the result of at for
+        chunk_size time points at a time.
+
+        Parameters:
+        ----------
+        dt:         float, time step. Default is None, using dt of solve
+        chunk_size: int, number of time points per chunk
+        """
+        T = self.solution.t[-1]
+        dt = self._grid_step() if dt is None else dt
+        n = int(T / dt + 1)
+        for first in range(0, n, chunk_size):
+            i = np.arange(first, min(first + chunk_size, n))
+            yield self.at(i * (T / max(n - 1, 1)))
+
+    def save(self, path):
+        """
+        Write the solution on the time grid to the directory path, creating
+        it if needed. The time points and each component of STATE are saved
+        as separate .npy files (t.npy, theta.npy, ...), so load can memory map
+        them, and the parameters of the model are saved in model.npz.
+
+        Parameters:
+        ----------
+        path:   str, directory to write to
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "t.npy"), self._t)
+        for name in self.STATE:
+            np.save(os.path.join(path, name.lstrip("_") + ".npy"), getattr(self, name))
+        parameters = {name: getattr(self, name) for name in self.PARAMETERS}
+        np.savez(
+            os.path.join(path, "model.npz"), model=type(self).__name__, **parameters
+        )
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Recreate a model and its solution from a directory written by save.
+        The loaded model has no solver result, so at and iter_chunks are not
+        available.
+
+        Parameters:
+        ----------
+        path:   str, directory to read from
+        mmap:   bool, if True (default) the solution is opened as read-only
+                memory maps, and only read from disk as it is used, e.g. by
+                the derived properties. If False, it is read into memory
+        """
+        with np.load(os.path.join(path, "model.npz")) as stored:
+            if str(stored["model"]) != cls.__name__:
+                raise ValueError(f"{path} does not hold a {cls.__name__} solution")
+            model = cls(**{name: stored[name].item() for name in cls.PARAMETERS})
+
+        mode = "r" if mmap else None
+        t = np.load(os.path.join(path, "t.npy"), mmap_mode=mode)
+        y = [
+            np.load(os.path.join(path, name.lstrip("_") + ".npy"), mmap_mode=mode)
+            for name in cls.STATE
+        ]
+        model.solution = None
+        model._store(t, y)
+        return model
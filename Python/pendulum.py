@@ -1,14 +1,65 @@
-from scipy import integrate
+import math
 import numpy as np
 import matplotlib.pyplot as plt
 from operator import add
+from ode_model import ODEModel, YOSHIDA4, derived, jit
 
 
-class Pendulum:
-    def __init__(self, L=1, M=1, g=9.81):
+@jit
+def _pendulum_rhs(y, k, b):
+    """
+    Right-hand side of the (dampened) pendulum, omega and
+    -k sin(theta) - b omega, as a NumPy array of the same size as y, which
+    is either a single state theta, omega or a (2, N) batch of states.
+    """
+    out = np.empty_like(y)
+    out[0] = y[1]
+    out[1] = -k * np.sin(y[0]) - b * y[1]
+    return out
+
+
+@jit
+def _pendulum_fixed_step(y, h, coefficients, k):
+    """
+    Velocity Verlet for the pendulum, composed with the substep
+    coefficients, a tuple of floats ((1.0,) for Verlet, YOSHIDA4 for
+    Yoshida), filling the preallocated (2, len(t)) array y from its first
+    column, one step of length h per column. Uses scalar math only, so it
+    is also fast as plain Python when Numba is not installed.
+    """
+    theta, omega = float(y[0, 0]), float(y[1, 0])
+    a = -k * math.sin(theta)
+    for i in range(1, y.shape[1]):
+        for c in coefficients:
+            s = c * h
+            half = s / 2
+            omega += half * a
+            theta += s * omega
+            a = -k * math.sin(theta)
+            omega += half * a
+        y[0, i] = theta
+        y[1, i] = omega
+
+
+class Pendulum(ODEModel):
+    SYMPLECTIC = True
+    STATE = ("_theta", "_omega")
+    PARAMETERS = ("L", "M", "g", "velocities")
+
+    def __init__(self, L=1, M=1, g=9.81, memoize=True, velocities="analytic"):
+        """
+        velocities: "analytic" or "gradient"
+                    default to analytic, computing the velocities and the
+                    kinetic energy from omega. If set to "gradient", they are
+                    found by differentiating the positions with np.gradient
+        """
+        if velocities not in ("analytic", "gradient"):
+            raise ValueError("velocities must be either analytic or gradient")
         self.L = L
         self.M = M
         self.g = g
+        self.memoize = memoize
+        self.velocities = velocities
         self.solve_called = False
 
     def __call__(self, t, y):
@@ -32,7 +83,39 @@ class Pendulum:
         domega = -(self.g / self.L) * np.sin(y[0])
         return dtheta, domega
 
-    def solve(self, y0, T, dt, angles="rad"):
+    def jac(self, t, y):
+        """
+        Returns the Jacobian of the right-hand side of ODE with respect to
+        theta, omega, as a NumPy array of size (2, 2).
+        """
+        return np.array([[0, 1], [-(self.g / self.L) * np.cos(y[0]), 0]])
+
+    def _fast_rhs(self):
+        """
+        Returns the right-hand side f(t, y) as the compiled _pendulum_rhs
+        with the parameters bound.
+        """
+        k = self.g / self.L
+        return lambda t, y: _pendulum_rhs(y, k, 0.0)
+
+    def _fixed_step(self, y0, t, method):
+        """
+        Symplectic integration with velocity Verlet ("verlet", second order)
+        or its Yoshida composition ("yoshida4", fourth order), one step per
+        time point, with _pendulum_fixed_step (compiled with Numba if
+        installed).
+        """
+        if not self.SYMPLECTIC:
+            raise ValueError(f"Method {method} requires a conservative model")
+
+        h = float(t[1] - t[0]) if len(t) > 1 else 0.0
+        coefficients = (1.0,) if method == "verlet" else YOSHIDA4
+        y = np.empty((2, len(t)))
+        y[:, 0] = y0
+        _pendulum_fixed_step(y, h, coefficients, self.g / self.L)
+        return y
+
+    def solve(self, y0, T, dt, angles="rad", **options):
         """
         Uses scipy.integrate.solve_ivp to solve initial value problem.
         Stores solution internally in instance of class.
@@ -49,6 +132,11 @@ class Pendulum:
         angles: "rad" or "deg"
                 default to rad
                 if set to "deg", converts to radians
+        options:
+                method, rtol, atol, dense_output, jac, fast, lazy and cache,
+                see ODEModel._integrate. method may also be
+                "verlet" or "yoshida4" for symplectic fixed step
+                integration, stepping dt at a time
 
         """
 
@@ -58,12 +146,11 @@ class Pendulum:
         elif angles != "deg" and angles != "rad":
             raise ValueError("Angles must be either rad or deg")
 
-        t = np.linspace(0, T, int(T / dt + 1))
-        self._t, self._theta, self._omega = (
-            integrate.solve_ivp(self, [0, T], y0, t_eval=t).t,
-            integrate.solve_ivp(self, [0, T], y0, t_eval=t).y[0],
-            integrate.solve_ivp(self, [0, T], y0, t_eval=t).y[1],
-        )
+        self._integrate(y0, T, dt, **options)
+
+    def _store(self, t, y):
+        self.solve_called = True
+        super()._store(t, y)
 
     @property
     def t(self):
@@ -89,34 +176,43 @@ class Pendulum:
             )
         return self._omega
 
-    @property
+    @derived
     def x(self):
         return self.L * np.sin(self.theta)
 
-    @property
+    @derived
     def y(self):
         return -self.L * np.cos(self.theta)
 
-    @property
+    @derived
     def potential(self):
         return self.M * self.g * (self.y + self.L)
 
-    @property
+    @derived
     def vx(self):
-        return np.gradient(self.x, self.t)
+        if self.velocities == "gradient":
+            return np.gradient(self.x, self.t)
+        return self.L * self.omega * np.cos(self.theta)
 
-    @property
+    @derived
     def vy(self):
-        return np.gradient(self.y, self.t)
+        if self.velocities == "gradient":
+            return np.gradient(self.y, self.t)
+        return self.L * self.omega * np.sin(self.theta)
 
-    @property
+    @derived
     def kinetic(self):
-        return 0.5 * self.M * (self.vx ** 2 + self.vy ** 2)
+        if self.velocities == "gradient":
+            return 0.5 * self.M * (self.vx ** 2 + self.vy ** 2)
+        return 0.5 * self.M * (self.L * self.omega) ** 2
 
 
 class DampenedPendulum(Pendulum):
-    def __init__(self, B, L=1, M=1, g=9.81):
-        super().__init__(L=1, M=1, g=9.81)
+    SYMPLECTIC = False
+    PARAMETERS = ("B",) + Pendulum.PARAMETERS
+
+    def __init__(self, B, L=1, M=1, g=9.81, memoize=True, velocities="analytic"):
+        super().__init__(L=1, M=1, g=9.81, memoize=memoize, velocities=velocities)
         self.solve_called = False
         self.B = B
 
@@ -125,6 +221,15 @@ class DampenedPendulum(Pendulum):
         domega = -(self.g / self.L) * np.sin(y[0]) - (self.B / self.M) * y[1]
         return dtheta, domega
 
+    def jac(self, t, y):
+        return np.array(
+            [[0, 1], [-(self.g / self.L) * np.cos(y[0]), -(self.B / self.M)]]
+        )
+
+    def _fast_rhs(self):
+        k, b = self.g / self.L, self.B / self.M
+        return lambda t, y: _pendulum_rhs(y, k, b)
+
 
 if __name__ == "__main__":
 
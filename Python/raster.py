@@ -0,0 +1,282 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgb
+
+
+class Rasterizer:
+    """
+    Accumulates 2D points into a fixed-resolution density image, as a
+    replacement for scattering every single point with matplotlib.
+
+    Points are binned into a grid of pixel counts, optionally together with
+    the sum of their colors, so memory use is O(pixels) and time O(points)
+    no matter how many points are added. Points can be added incrementally,
+    e.g. one chunk at a time from ChaosGame.iterate_chunks.
+
+    Colors are either scalars (mapped through a colormap when rendering,
+    like the c argument of plt.scatter) or RGB triplets. Each pixel gets the
+    mean color of its points, and its opacity is given by the tone mapped
+    density.
+
+    Points of any floating point type (e.g. float32 points from
+    ChaosGame.iterate) are binned CHUNK_SIZE at a time, so adding them never
+    allocates float64 copies of all points.
+    """
+
+    CHUNK_SIZE = 2 ** 20
+
+    def __init__(self, extent, resolution=1000):
+        """
+        Parameters
+        ----------
+        extent:     tuple (xmin, xmax, ymin, ymax), area covered by the image.
+                    Points outside the area are ignored
+        resolution: int, number of pixels along the x-axis. The number of
+                    pixels along the y-axis follows from the aspect ratio of
+                    extent, giving square pixels. Default is 1000
+
+        Stores
+        -------
+        extent:     tuple
+        width:      int, number of pixels along the x-axis
+        height:     int, number of pixels along the y-axis
+        counts:     NumPy array of size (height, width), points per pixel
+        """
+        xmin, xmax, ymin, ymax = map(float, extent)
+        if not (xmax > xmin and ymax > ymin):
+            raise ValueError("extent must be given as (xmin, xmax, ymin, ymax)!")
+        if int(resolution) < 1:
+            raise ValueError("resolution must be a positive integer!")
+
+        self.extent = (xmin, xmax, ymin, ymax)
+        self.width = int(resolution)
+        self.height = max(1, int(round(self.width * (ymax - ymin) / (xmax - xmin))))
+        self.counts = np.zeros((self.height, self.width))
+        self._color_sum = None
+        self._vmin, self._vmax = np.inf, -np.inf
+
+    @classmethod
+    def from_points(cls, points, colors=None, resolution=1000, margin=0.02):
+        """
+        Create a Rasterizer whose extent covers points (with a relative
+        margin on each side), and add the points to it.
+        """
+        points = np.asarray(points)
+        xmin, ymin = points.min(axis=0)
+        xmax, ymax = points.max(axis=0)
+        dx = max(xmax - xmin, 1e-12) * margin
+        dy = max(ymax - ymin, 1e-12) * margin
+        raster = cls((xmin - dx, xmax + dx, ymin - dy, ymax + dy), resolution)
+        raster.add(points, colors)
+        return raster
+
+    def empty_copy(self):
+        """
+        Returns a Rasterizer with the same extent and resolution, but no
+        points added.
+        """
+        return Rasterizer(self.extent, self.width)
+
+    def merge(self, other):
+        """
+        Add the points of another Rasterizer with the same extent and
+        resolution, e.g. a partial image computed by another process.
+        """
+        if other.extent != self.extent or other.counts.shape != self.counts.shape:
+            raise ValueError("Can only merge rasters of the same extent and shape!")
+        self.counts += other.counts
+        if other._color_sum is not None:
+            if self._color_sum is None:
+                self._color_sum = np.zeros_like(other._color_sum)
+            elif self._color_sum.shape != other._color_sum.shape:
+                raise ValueError("colors must be of the same kind in both rasters!")
+            self._color_sum += other._color_sum
+        self._vmin = min(self._vmin, other._vmin)
+        self._vmax = max(self._vmax, other._vmax)
+
+    def _pixels(self, points):
+        """
+        Returns the flat pixel index of each point inside the extent, and a
+        boolean mask selecting those points.
+        """
+        xmin, xmax, ymin, ymax = self.extent
+        if points.dtype.itemsize < 4:
+            # float16 cannot resolve pixel coordinates beyond a few hundred
+            points = points.astype(np.float32)
+        fx = (points[:, 0] - xmin) * (self.width / (xmax - xmin))
+        fy = (points[:, 1] - ymin) * (self.height / (ymax - ymin))
+        inside = (fx >= 0) & (fx <= self.width) & (fy >= 0) & (fy <= self.height)
+        i = np.minimum(fx[inside].astype(np.intp), self.width - 1)
+        j = np.minimum(fy[inside].astype(np.intp), self.height - 1)
+        return j * self.width + i, inside
+
+    def add(self, points, colors=None):
+        """
+        Add points to the image.
+
+        Parameters
+        ----------
+        points:     arraylike of size (N, 2)
+        colors:     None, arraylike of size N with scalar colors or arraylike
+                    of size (N, 3) with RGB colors in [0, 1]. All calls to add
+                    on the same Rasterizer must use the same kind of colors
+        """
+        points = np.asarray(points)
+        if colors is not None:
+            colors = np.asarray(colors)
+            if not np.issubdtype(colors.dtype, np.floating):
+                colors = colors.astype(float)
+            if colors.ndim == 1:
+                colors = colors[:, None]
+            if self._color_sum is None:
+                self._color_sum = np.zeros(self.counts.shape + (colors.shape[1],))
+            elif self._color_sum.shape[2] != colors.shape[1]:
+                raise ValueError(
+                    "colors must be of the same kind in every call to add!"
+                )
+            if colors.shape[1] == 1 and len(colors):
+                self._vmin = min(self._vmin, float(colors.min()))
+                self._vmax = max(self._vmax, float(colors.max()))
+
+        for start in range(0, len(points), self.CHUNK_SIZE):
+            chunk = slice(start, start + self.CHUNK_SIZE)
+            self._add(points[chunk], None if colors is None else colors[chunk])
+
+    def _add(self, points, colors):
+        """
+        Bin a chunk of points, with colors of size (m, 1), (m, 3) or None.
+        """
+        pixels, inside = self._pixels(points)
+        size = self.width * self.height
+        self.counts += np.bincount(pixels, minlength=size).reshape(self.counts.shape)
+        if colors is None:
+            return
+        colors = colors[inside]
+        for k in range(colors.shape[1]):
+            self._color_sum[:, :, k] += np.bincount(
+                pixels, weights=colors[:, k], minlength=size
+            ).reshape(self.counts.shape)
+
+    def refine(self, batches, tol=0.05, ax=None, **kwargs):
+        """
+        Add batches of points one at a time, until the image converges.
+
+        After each batch, the change of the image is measured as the
+        absolute change of the tone mapped density summed over the pixels,
+        relative to the summed density, so it is 1 after the first batch.
+        Once it falls below tol, adding more points no longer changes the
+        picture visibly, and the remaining batches are not consumed.
+
+        Use growing batches, e.g. from ChaosGame.iterate_chunks with
+        growth > 1, so a coarse image is available after the first small
+        batch while the total number of batches stays small.
+
+        Parameters
+        ----------
+        batches:    iterable of arrays of points, or of tuples (points,
+                    colors) with colors as in add
+        tol:        float, convergence threshold. Default is 0.05
+        ax:         matplotlib axes or None. If given, the image is drawn on
+                    ax and redrawn after each batch, as a live preview
+        kwargs:     keyword arguments passed on to image for the preview.
+                    tone and gamma are also used for the convergence test
+
+        Returns
+        -------
+        changes:    list, the change after each batch
+        """
+        tone = {key: kwargs[key] for key in ("tone", "gamma") if key in kwargs}
+        previous = self.density(**tone)
+        changes = []
+        preview = None
+        for batch in batches:
+            points, colors = batch if isinstance(batch, tuple) else (batch, None)
+            self.add(points, colors)
+            current = self.density(**tone)
+            total = current.sum()
+            changes.append(np.abs(current - previous).sum() / total if total else 1.0)
+            previous = current
+
+            if ax is not None:
+                if preview is None:
+                    preview = self.show(ax, **kwargs)
+                else:
+                    preview.set_data(self.image(**kwargs))
+                plt.pause(0.001)
+            if changes[-1] < tol:
+                break
+        return changes
+
+    def density(self, tone="log", gamma=1.0):
+        """
+        Returns the tone mapped density, scaled to [0, 1].
+
+        Parameters
+        ----------
+        tone:       "log" or "linear". Default is "log"
+        gamma:      float, the density is raised to the power 1/gamma after
+                    the tone mapping. Default is 1
+        """
+        peak = self.counts.max()
+        if peak == 0:
+            return np.zeros_like(self.counts)
+        if tone == "log":
+            D = np.log1p(self.counts) / np.log1p(peak)
+        elif tone == "linear":
+            D = self.counts / peak
+        else:
+            raise ValueError("tone must be either log or linear")
+        if gamma != 1:
+            D **= 1 / gamma
+        return D
+
+    def image(self, color="black", cmap="jet", tone="log", gamma=1.0):
+        """
+        Returns the image as a NumPy array of size (height, width, 4) with
+        RGBA values in [0, 1]. Row 0 is the bottom of the image.
+
+        Parameters
+        ----------
+        color:      matplotlib color used when no colors were added
+        cmap:       colormap used for scalar colors. Default is "jet"
+        tone:       see density
+        gamma:      see density
+        """
+        rgba = np.zeros(self.counts.shape + (4,))
+        if self._color_sum is None:
+            rgba[:, :, :3] = to_rgb(color)
+        else:
+            mean = self._color_sum / np.maximum(self.counts, 1)[:, :, None]
+            if mean.shape[2] == 1:
+                span = self._vmax - self._vmin
+                values = (mean[:, :, 0] - self._vmin) / (span if span > 0 else 1)
+                rgba[:, :, :3] = plt.get_cmap(cmap)(values)[:, :, :3]
+            else:
+                rgba[:, :, :3] = np.clip(mean, 0, 1)
+        rgba[:, :, 3] = self.density(tone, gamma)
+        return rgba
+
+    def show(self, ax=None, **kwargs):
+        """
+        Draw the image on the axes ax (default the current axes). Keyword
+        arguments are passed on to image.
+        """
+        if ax is None:
+            ax = plt.gca()
+        return ax.imshow(
+            self.image(**kwargs),
+            extent=self.extent,
+            origin="lower",
+            interpolation="nearest",
+        )
+
+    def savepng(self, outfile, **kwargs):
+        """
+        Write the image directly to a png file, one pixel per bin, without
+        creating a matplotlib figure. Keyword arguments are passed on to image.
+        """
+        if outfile.split(".")[-1] == outfile:
+            outfile += ".png"
+        elif outfile.split(".")[-1] != "png":
+            raise ValueError("outfile must be a .png.file!")
+        plt.imsave(outfile, self.image(**kwargs), origin="lower")
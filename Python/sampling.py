@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class AliasSampler:
+    """
+    Walker's alias method (in the numerically stable variant by Vose) for
+    drawing indices 0, ..., k-1 with given probabilities.
+
+    The alias table is built once in O(k). Each draw then costs one uniform
+    number and one comparison, independent of k, and sample draws any
+    number of indices with a few array operations. The integer part of
+    k*u picks the column and its fractional part decides between the column
+    and its alias, so every index is a function of one uniform number and
+    the drawn indices do not depend on how the draws are split into calls.
+    """
+
+    def __init__(self, prob):
+        """
+        Parameters
+        ----------
+        prob:   arraylike of size k, non-negative weights of the indices.
+                Normalized to sum to 1
+
+        Stores
+        -------
+        prob:   NumPy array of size k, the normalized probabilities
+        accept: NumPy array of size k, probability of keeping a drawn index
+        alias:  NumPy array of size k, index used when it is not kept
+        """
+        prob = np.array(prob, dtype=float)
+        if prob.ndim != 1 or len(prob) == 0:
+            raise ValueError("prob must be a non-empty 1D array!")
+        if np.any(prob < 0) or not prob.sum() > 0:
+            raise ValueError("prob must be non-negative with a positive sum!")
+
+        k = len(prob)
+        self.prob = prob / prob.sum()
+        scaled = self.prob * k
+        self.accept = np.ones(k)
+        self.alias = np.arange(k)
+        small = [i for i in range(k) if scaled[i] < 1]
+        large = [i for i in range(k) if scaled[i] >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.accept[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1 - scaled[s]
+            if scaled[l] < 1:
+                small.append(l)
+            else:
+                large.append(l)
+
+    def sample(self, size, rng=None):
+        """
+        Draw indices.
+
+        Parameters
+        ----------
+        size:   int or tuple, shape of the output
+        rng:    numpy.random.Generator to draw from. Default is None, using
+                the global random state
+
+        Returns
+        -------
+        idx:    NumPy array of drawn indices
+        """
+        k = len(self.prob)
+        u = (np.random if rng is None else rng).random(size=size)
+        v = u * k
+        i = np.minimum(v.astype(np.intp), k - 1)
+        return np.where(v - i < self.accept[i], i, self.alias[i])
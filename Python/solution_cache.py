@@ -0,0 +1,160 @@
+import os
+from collections import OrderedDict
+import numpy as np
+
+
+class SolutionCache:
+    """
+    Content-addressed cache of ODE solutions on their time grid, shared by
+    any number of models. Pass it to solve with the cache option, e.g.
+
+        cache = SolutionCache(path="solutions")
+        p.solve(y0, T, dt, cache=cache)
+
+    Solutions are looked up by a key hashing the model class, its
+    parameters, the initial state, the time grid and the solver options,
+    see ODEModel._cache_key. The most recently used solutions are kept in
+    memory. If path is given, every solution is also written to disk there,
+    where it can be shared between processes and runs, and the least
+    recently used files are deleted when the directory grows beyond
+    max_bytes.
+    """
+
+    def __init__(self, maxsize=128, path=None, max_bytes=2 ** 30):
+        """
+        Parameters
+        ----------
+        maxsize:    int, number of solutions kept in memory. Default is 128
+        path:       str or None, directory of the disk tier. Default is None,
+                    caching in memory only
+        max_bytes:  int, size bound of the disk tier in bytes. Default is
+                    1 GiB
+        """
+        if int(maxsize) < 0:
+            raise ValueError("maxsize must be a non-negative integer!")
+        self.maxsize = int(maxsize)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self.hits = self.disk_hits = self.misses = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, key + ".npz")
+
+    def get(self, key):
+        """
+        Returns the cached time points and solution (t, y) for key as
+        read-only arrays, or None if key is not cached.
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        if self.path is not None:
+            try:
+                with np.load(self._file(key)) as stored:
+                    entry = stored["t"], stored["y"]
+                os.utime(self._file(key))
+            except (FileNotFoundError, KeyError, ValueError, OSError):
+                entry = None
+            if entry is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._remember(key, entry)
+                return entry
+
+        self.misses += 1
+        return None
+
+    def put(self, key, t, y):
+        """
+        Store the time points t and solution y under key.
+        """
+        entry = (np.array(t, dtype=float), np.array(y, dtype=float))
+        self._remember(key, entry)
+        if self.path is not None:
+            # Write to a temporary file and rename it, so other processes
+            # never read a partially written solution.
+            tmp = os.path.join(self.path, f"{key}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.savez(f, t=entry[0], y=entry[1])
+            os.replace(tmp, self._file(key))
+            self._evict()
+
+    def _remember(self, key, entry):
+        for array in entry:
+            array.flags.writeable = False
+        if self.maxsize == 0:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _files(self):
+        """
+        Returns (mtime, size, path) of each solution in the disk tier,
+        skipping files deleted by another process meanwhile.
+        """
+        files = []
+        for f in os.scandir(self.path):
+            if f.name.endswith(".npz"):
+                try:
+                    stat = f.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, f.path))
+        return files
+
+    def _evict(self):
+        """
+        Delete the least recently used files of the disk tier until it fits
+        within max_bytes.
+        """
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, file in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        """
+        Returns a dict with the number of hits (of which disk_hits were read
+        from disk), misses, the hit rate and the number of solutions and
+        bytes held in each tier.
+        """
+        lookups = self.hits + self.misses
+        files = self._files() if self.path is not None else []
+        disk_files, disk_bytes = len(files), sum(size for _, size, _ in files)
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": sum(t.nbytes + y.nbytes for t, y in self._memory.values()),
+            "disk_entries": disk_files,
+            "disk_bytes": disk_bytes,
+        }
+
+    def clear(self):
+        """
+        Empty both tiers and reset the statistics.
+        """
+        self._memory.clear()
+        self.hits = self.disk_hits = self.misses = 0
+        if self.path is not None:
+            for f in os.scandir(self.path):
+                if f.name.endswith(".npz"):
+                    try:
+                        os.remove(f.path)
+                    except FileNotFoundError:
+                        pass
@@ -0,0 +1,93 @@
+import os
+import pytest
+import matplotlib.pyplot as plt
+from batch_render import render, render_batch, up_to_date
+
+
+def manifest(tmp_path):
+    return [
+        {"n": 3, "r": 0.5, "steps": 2000, "outfile": str(tmp_path / "a.png")},
+        {
+            "n": 5,
+            "r": 1 / 3,
+            "steps": 2000,
+            "color": True,
+            "raster": True,
+            "outfile": str(tmp_path / "out" / "b.png"),
+        },
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_batch_skips_up_to_date_jobs(tmp_path, workers):
+    jobs = manifest(tmp_path)
+    report = render_batch(jobs, workers=workers)
+    assert [entry["status"] for entry in report] == ["rendered", "rendered"]
+    assert all(entry["seconds"] > 0 for entry in report)
+    assert all(os.path.exists(job["outfile"]) for job in jobs)
+
+    report = render_batch(jobs, workers=workers)
+    assert [entry["status"] for entry in report] == ["skipped", "skipped"]
+
+    jobs[0]["steps"] = 3000
+    report = render_batch(jobs, workers=workers)
+    assert [entry["status"] for entry in report] == ["rendered", "skipped"]
+
+    report = render_batch(jobs, workers=workers, seed=1)
+    assert [entry["status"] for entry in report] == ["rendered", "rendered"]
+
+
+def test_render_batch_force(tmp_path):
+    jobs = manifest(tmp_path)
+    render_batch(jobs, workers=1)
+    report = render_batch(jobs, workers=1, force=True)
+    assert [entry["status"] for entry in report] == ["rendered", "rendered"]
+
+
+def test_render_closes_figures(tmp_path):
+    job = manifest(tmp_path)[0]
+    figures = len(plt.get_fignums())
+    render(job)
+    assert len(plt.get_fignums()) == figures
+    assert up_to_date(job)
+
+
+def test_render_is_reproducible(tmp_path):
+    job = manifest(tmp_path)[1]
+    render(job, seed=3)
+    with open(job["outfile"], "rb") as f:
+        first = f.read()
+    render(job, seed=3)
+    with open(job["outfile"], "rb") as f:
+        assert f.read() == first
+
+
+def test_render_batch_raises_ValueError(tmp_path):
+    with pytest.raises(ValueError):
+        render_batch([{"n": 3, "r": 0.5}])
+    with pytest.raises(ValueError):
+        render_batch(manifest(tmp_path), workers=0)
+
+
+@pytest.mark.parametrize("outfile", ["x.pdf", "x.PNG", "figures.d/x.jpg"])
+def test_render_batch_rejects_other_formats(tmp_path, outfile):
+    job = {"n": 3, "r": 0.5, "outfile": str(tmp_path / outfile)}
+    with pytest.raises(ValueError):
+        render_batch([job], workers=1)
+
+
+@pytest.mark.parametrize("outfile", ["x", "figures.d/x", "./figures/chaos1"])
+def test_render_batch_appends_png(tmp_path, monkeypatch, outfile):
+    monkeypatch.chdir(tmp_path)
+    job = {"n": 3, "r": 0.5, "steps": 100, "raster": True, "outfile": outfile}
+    report = render_batch([job], workers=1)
+    assert report[0]["outfile"] == outfile + ".png"
+    assert os.path.exists(outfile + ".png")
+
+
+def test_render_batch_rejects_duplicate_outfiles(tmp_path):
+    jobs = manifest(tmp_path)
+    jobs[1]["outfile"] = str(tmp_path / "a")
+    with pytest.raises(ValueError):
+        render_batch(jobs, workers=1)
+    assert not os.path.exists(tmp_path / "a.png")
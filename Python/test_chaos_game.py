@@ -9,6 +9,22 @@ def test_init_raises_ValueError(n, r):
         ChaosGame(n, r)
 
 
+@pytest.mark.parametrize("method", ["loop", "vectorized"])
+def test_changing_r_recomputes_moves(method):
+    a = ChaosGame(3, 1 / 2)
+    a.iterate(5000, method=method, rng=np.random.default_rng(1))
+    a.r = 1 / 3
+    a.iterate(5000, method=method, rng=np.random.default_rng(1))
+    b = ChaosGame(3, 1 / 3)
+    b.iterate(5000, method=method, rng=np.random.default_rng(1))
+    assert np.allclose(a.points, b.points, rtol=0, atol=1e-14)
+
+    with pytest.raises(ValueError):
+        a.r = 1.5
+    with pytest.raises(AttributeError):
+        a.n = 4
+
+
 def test_savepng_raises_ValueError():
     with pytest.raises(ValueError):
         a = ChaosGame(3, 0.5)
@@ -25,3 +41,159 @@ def test_generate_n_gon():
         ]
     )
     assert np.all(np.isclose(a.list, triangle))
+
+
+@pytest.mark.parametrize("n, r", [(3, 1 / 2), (5, 1 / 3), (6, 0.99), (4, 1e-20)])
+def test_vectorized_iterate_matches_loop(n, r):
+    a = ChaosGame(n, r)
+    np.random.seed(1)
+    a.iterate(3000, method="loop")
+    expected = a.points
+    np.random.seed(1)
+    a.iterate(3000, method="vectorized")
+    assert np.allclose(a.points, expected, rtol=0, atol=1e-14)
+
+
+def test_iterate_raises_ValueError():
+    with pytest.raises(ValueError):
+        ChaosGame(3).iterate(10, method="scan")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1000, 5000])
+def test_iterate_chunks_matches_iterate(chunk_size):
+    a = ChaosGame(5, 1 / 3)
+    np.random.seed(2)
+    a.iterate(1000)
+    np.random.seed(2)
+    chunks = list(a.iterate_chunks(1000, chunk_size))
+    assert all(len(points) <= chunk_size for points, idx in chunks)
+    points = np.concatenate([points for points, idx in chunks])
+    idx = np.concatenate([idx for points, idx in chunks])
+    assert np.allclose(points, a.points, rtol=0, atol=1e-14)
+    assert np.all(idx == a.idx)
+
+
+def test_iterate_parallel_is_reproducible():
+    a = ChaosGame(4, 1 / 3)
+    a.iterate_parallel(1005, workers=2, seed=42, chunk_size=100)
+    points, idx = a.points, a.idx
+    a.iterate_parallel(1005, workers=2, seed=42)
+    assert points.shape == (1000, 2)
+    assert np.allclose(points, a.points, rtol=0, atol=1e-14)
+    assert np.all(idx == a.idx)
+
+
+@pytest.mark.parametrize("steps, workers", [(5, 1), (3, 2), (7, 4)])
+def test_iterate_parallel_with_empty_shares(steps, workers):
+    a = ChaosGame(3)
+    a.iterate_parallel(steps, workers=workers, seed=0)
+    assert a.points.shape == (max(steps - 5, 0), 2)
+    assert len(a.idx) == len(a.points)
+
+
+def test_iterate_parallel_into_raster():
+    from raster import Rasterizer
+
+    raster = Rasterizer((-1, 1, -1, 1), resolution=50)
+    ChaosGame(3).iterate_parallel(1005, workers=2, seed=1, raster=raster, color=True)
+    assert raster.counts.sum() == 1000
+
+
+def test_weighted_corners():
+    a = ChaosGame(4, weights=[0, 1, 1, 2])
+    a.iterate(20000)
+    freq = np.bincount(a.idx, minlength=4) / len(a.idx)
+    assert freq[0] == 0
+    assert np.allclose(freq, [0, 0.25, 0.25, 0.5], atol=0.02)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64, 1000])
+def test_weighted_iterate_chunks_matches_iterate(chunk_size):
+    a = ChaosGame(4, 1 / 3, weights=[1, 2, 3, 4])
+    a.iterate(1000, rng=np.random.default_rng(5))
+    rng = np.random.default_rng(5)
+    chunks = list(a.iterate_chunks(1000, chunk_size, rng=rng))
+    points = np.concatenate([points for points, idx in chunks])
+    idx = np.concatenate([idx for points, idx in chunks])
+    assert np.allclose(points, a.points, rtol=0, atol=1e-14)
+    assert np.all(idx == a.idx)
+
+    idx = a.idx
+    a.iterate(1000, rng=np.random.default_rng(5), dtype=np.float32)
+    assert np.all(a.idx == idx)
+
+
+@pytest.mark.parametrize("weights", [[1, 1], [1, -1, 1], [0, 0, 0]])
+def test_weights_raise_ValueError(weights):
+    with pytest.raises(ValueError):
+        ChaosGame(3, weights=weights)
+
+
+def test_gradient_color_is_cached_per_iterate():
+    a = ChaosGame(5)
+    a.iterate(2000)
+    C = a.gradient_color
+    assert C.shape == (len(a.points),) and C.dtype == np.float32
+    expected = np.zeros(len(a.idx))
+    expected[0] = a.idx[0]
+    for i in range(len(a.idx) - 1):
+        expected[i + 1] = 0.5 * (expected[i] + a.idx[i + 1])
+    assert np.allclose(C, expected, atol=1e-6)
+    assert a.gradient_color is C
+    a.iterate(100)
+    assert len(a.gradient_color) == len(a.points)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float16])
+def test_iterate_dtype(dtype):
+    a = ChaosGame(5)
+    np.random.seed(3)
+    a.iterate(5000)
+    points, idx = a.points, a.idx
+    np.random.seed(3)
+    a.iterate(5000, dtype=dtype)
+    assert a.points.dtype == dtype and a.idx.dtype == np.uint8
+    assert np.array_equal(a.idx, idx)
+    assert np.allclose(a.points, points, atol=np.finfo(dtype).eps)
+    assert a.gradient_color.dtype == (np.float16 if dtype == np.float16 else np.float32)
+    assert a.rasterize(resolution=100).counts.sum() == len(points)
+
+
+def test_iterate_parallel_dtype():
+    a = ChaosGame(3)
+    a.iterate_parallel(1005, workers=2, seed=42, dtype=np.float32)
+    assert a.points.dtype == np.float32 and a.idx.dtype == np.uint8
+    assert len(a.points) == 1000
+
+
+@pytest.mark.parametrize("n, r", [(3, 0.5), (4, 0.3), (6, 1 / 3), (5, 0), (3, 1)])
+@pytest.mark.parametrize("steps", [1, 6, 1001])
+def test_composed_maps_match_single_moves(n, r, steps):
+    a = ChaosGame(n, r)
+    for k in (2, 3, 5):
+        np.random.seed(4)
+        a.iterate(steps, discard=0, method="vectorized", k=1)
+        points = a.points
+        np.random.seed(4)
+        a.iterate(steps, discard=0, method="vectorized", k=k)
+        assert a.points.shape == points.shape
+        assert np.allclose(a.points, points, rtol=0, atol=1e-14)
+
+
+def test_default_k_bounds_table_size():
+    for n in (3, 4, 6, 20, 3000):
+        a = ChaosGame(n)
+        assert a.n ** a.k <= ChaosGame.COMPOSED_TABLE_SIZE or a.k == 1
+        assert a.n ** (a.k + 1) > ChaosGame.COMPOSED_TABLE_SIZE
+    with pytest.raises(ValueError):
+        ChaosGame(3).iterate(2000, k=0)
+
+
+def test_iterate_chunks_growth():
+    a = ChaosGame(4)
+    np.random.seed(6)
+    a.iterate(10000)
+    np.random.seed(6)
+    chunks = list(a.iterate_chunks(10000, 100, growth=2))
+    assert [len(idx) for points, idx in chunks][:3] == [95, 200, 400]
+    assert np.allclose(np.concatenate([p for p, i in chunks]), a.points, atol=1e-14)
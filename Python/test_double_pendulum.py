@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from double_pendulum import delta, domega1_dt, domega2_dt, DoublePendulum
 
 M1 = 1
@@ -71,3 +72,150 @@ def test_DoublePendulum_call():
     d = DoublePendulum()
     assert d(0, [0, 0.1, 0, 0.2])[0] == 0.1
     assert d(0, [0, 0.1, 0, 0.2])[2] == 0.2
+
+
+def test_derived_properties_are_cached():
+    d = DoublePendulum()
+    d.solve([1, 0, 0.5, 0], 2, 0.1)
+    assert d.x2 is d.x2
+    kinetic = d.kinetic
+    d.M2 = 2
+    assert d.kinetic is not kinetic
+
+
+def test_solve_ensemble_matches_solve():
+    d = DoublePendulum()
+    y0 = [[1, 0, 0.5, 0], [0.3, 0.1, -0.2, 0], [0, 0, 0, 0]]
+    t, Y = d.solve_ensemble(y0, 1, 0.001)
+    assert Y.shape == (3, 4, 1001)
+    for i in range(3):
+        d.solve(list(y0[i]), 1, 0.001, method="DOP853", rtol=1e-11, atol=1e-11)
+        assert abs(Y[i, 0] - d.theta1).max() < 1e-8
+        assert abs(Y[i, 2] - d.theta2).max() < 1e-8
+
+
+def test_solve_ensemble_sharded_to_disk(tmp_path):
+    y0 = np.random.random((5, 4))
+    t, Y = DoublePendulum().solve_ensemble(y0, 1, 0.1)
+    path = str(tmp_path / "ensemble.npy")
+    t, Y_disk = DoublePendulum().solve_ensemble(y0, 1, 0.1, workers=2, path=path)
+    assert np.all(Y == Y_disk)
+
+
+def test_solve_ensemble_raises_IndexError():
+    with pytest.raises(IndexError):
+        DoublePendulum().solve_ensemble([0, 0, 0, 0], 10, 1)
+
+
+def finite_difference_jacobian(f, y, h=1e-6):
+    y = np.array(y, dtype=float)
+    J = np.zeros((len(y), len(y)))
+    for j in range(len(y)):
+        e = np.zeros(len(y))
+        e[j] = h
+        J[:, j] = (np.array(f(0, y + e)) - np.array(f(0, y - e))) / (2 * h)
+    return J
+
+
+@pytest.mark.parametrize(
+    "params, y",
+    [
+        ((1, 1, 1, 1), [0, 0, 0, 0]),
+        ((1, 1, 1, 1), [1.1, 0.3, -0.4, 0.7]),
+        ((2.5, 1, 0.4, 1.3), [2.0, -1.5, 0.5, 3.0]),
+    ],
+)
+def test_jac_matches_finite_differences(params, y):
+    d = DoublePendulum(*params)
+    assert np.allclose(d.jac(0, y), finite_difference_jacobian(d, y), atol=1e-7)
+
+
+def test_solve_uses_jac():
+    d = DoublePendulum()
+    d.solve([np.pi / 2, 0, np.pi / 4, 0], 5, 0.01)
+    assert d.solution.njev > 0
+    theta1 = d.theta1
+    d.solve([np.pi / 2, 0, np.pi / 4, 0], 5, 0.01, jac=False)
+    assert np.allclose(d.theta1, theta1, atol=1e-2)
+
+
+@pytest.mark.parametrize("method, tol", [("verlet", 1e-2), ("yoshida4", 1e-4)])
+def test_fixed_step_methods_converge(method, tol):
+    y0 = [np.pi / 2, 0, np.pi / 4, 0]
+    exact = DoublePendulum()
+    exact.solve(list(y0), 5, 0.01, method="DOP853", rtol=1e-12, atol=1e-12)
+    d = DoublePendulum()
+    d.solve(list(y0), 5, 0.01, method=method)
+    assert abs(d.theta1 - exact.theta1).max() < tol
+    assert abs(d.theta2 - exact.theta2).max() < tol
+
+
+def test_fixed_step_warns_without_convergence():
+    d = DoublePendulum()
+    t = np.linspace(0, 1, 11)
+    with pytest.warns(RuntimeWarning):
+        d._fixed_step(np.array([np.pi / 2, 0, np.pi / 4, 0]), t, "verlet", max_iter=1)
+
+
+def test_fast_rhs_matches_call():
+    d = DoublePendulum(M1=2.5, L1=1, M2=0.4, L2=1.3)
+    y = np.random.random((4, 10))
+    assert np.allclose(d._fast_rhs()(0, y), d(0, y))
+    y0 = np.random.random((3, 4))
+    assert np.allclose(
+        d.solve_ensemble(y0, 1, 0.1, fast=True)[1], d.solve_ensemble(y0, 1, 0.1)[1]
+    )
+
+
+def test_analytic_velocities_match_gradient():
+    y0 = [np.pi / 2, 0, np.pi / 4, 0]
+    d = DoublePendulum(M1=2.5, L1=1, M2=0.4, L2=1.3)
+    d.solve(list(y0), 2, 0.001, method="DOP853", rtol=1e-10, atol=1e-10)
+    e = DoublePendulum(M1=2.5, L1=1, M2=0.4, L2=1.3, velocities="gradient")
+    e.solve(list(y0), 2, 0.001, method="DOP853", rtol=1e-10, atol=1e-10)
+    for v in ("vx1", "vy1", "vx2", "vy2"):
+        assert np.allclose(getattr(d, v)[1:-1], getattr(e, v)[1:-1], atol=1e-3)
+    K1 = 0.5 * d.M1 * (d.vx1 ** 2 + d.vy1 ** 2)
+    K2 = 0.5 * d.M2 * (d.vx2 ** 2 + d.vy2 ** 2)
+    assert np.allclose(d.kinetic, K1 + K2)
+
+
+def test_frames_follow_solution():
+    d = DoublePendulum()
+    d.solve([np.pi / 2, 0, np.pi / 4, 0], 2, 0.01)
+    frames = [frame.copy() for frame in d.frames(size=64)]
+    assert len(frames) == len(d.t)
+    assert frames[0].shape == (64, 64, 3) and frames[0].dtype == np.uint8
+    assert (frames[0] < 255).any()
+    assert not np.array_equal(frames[0], frames[-1])
+
+
+def test_frames_stream_lazy_solution():
+    y0 = [np.pi / 2, 0, np.pi / 4, 0]
+    d = DoublePendulum()
+    d.solve(list(y0), 2, 0.01)
+    e = DoublePendulum()
+    e.solve(list(y0), 2, 0.01, lazy=True)
+    streamed = [frame.copy() for frame in e.frames(size=64, chunk_size=30)]
+    assert len(streamed) == len(d.t)
+    for a, b in zip(streamed, d.frames(size=64)):
+        assert np.array_equal(a, b)
+
+
+def test_save_animation_raises_without_encoder(tmp_path):
+    d = DoublePendulum()
+    d.solve([np.pi / 2, 0, np.pi / 4, 0], 1, 0.1)
+    with pytest.raises(FileNotFoundError):
+        d.save_animation(str(tmp_path / "out"), encoder="no-such-encoder")
+
+
+def test_save_load_roundtrip(tmp_path):
+    d = DoublePendulum(M1=2.5, L1=1, M2=0.4, L2=1.3)
+    d.solve([np.pi / 2, 0, np.pi / 4, 0], 2, 0.01)
+    d.save(str(tmp_path / "run"))
+    e = DoublePendulum.load(str(tmp_path / "run"))
+    assert isinstance(e.theta2, np.memmap)
+    for name in ("t", "omega1", "x2", "y2", "kinetic", "potential"):
+        assert np.array_equal(getattr(e, name), getattr(d, name))
+    with pytest.raises(ValueError):
+        e.at(0.5)
@@ -1,6 +1,55 @@
+import pytest
+import numpy as np
 from exp_decay import ExponentialDecay
 
 
 def test_ExponenitalDecay_call():
     P = ExponentialDecay(0.4)
     assert abs(P(0, 3.2) + 1.28) < 1e-12
+
+
+def test_save_load_roundtrip(tmp_path):
+    model = ExponentialDecay(0.4)
+    t, u = model.solve(5, 10, 0.1)
+    model.save(str(tmp_path / "run"))
+    loaded = ExponentialDecay.load(str(tmp_path / "run"))
+    assert loaded.a == 0.4
+    assert (loaded.t == t).all() and (loaded.u == u).all()
+
+
+def test_exact_broadcasts_rates_and_initial_values():
+    a = np.array([0.1, 0.4, 0.8])
+    t, u = ExponentialDecay(a).exact(5, 10, 0.1)
+    assert u.shape == (3, len(t))
+    for rate, u_rate in zip(a, u):
+        _, numerical = ExponentialDecay(rate).solve(5, 10, 0.1, rtol=1e-10, atol=1e-10)
+        assert np.allclose(u_rate, numerical, atol=1e-8)
+    _, u = ExponentialDecay(a).exact([[1], [2]], 10, 0.1)
+    assert u.shape == (2, 3, len(t))
+    assert np.allclose(u[1], 2 * u[0])
+
+
+def test_solve_exact_mode():
+    t, u = ExponentialDecay(0.4).solve(5, 10, 0.1, method="exact")
+    assert np.allclose(u, 5 * np.exp(-0.4 * t))
+
+
+def test_solve_exact_mode_stores_solution(tmp_path):
+    from solution_cache import SolutionCache
+
+    cache = SolutionCache()
+    model = ExponentialDecay(0.4)
+    model.solve(1.0, 1, 0.1)
+    t, u = model.solve(2.0, 1, 0.1, method="exact", cache=cache)
+    assert np.array_equal(model.t, t) and np.array_equal(model.u, u)
+    assert np.allclose(model.u, 2 * np.exp(-0.4 * t))
+    model.solve(2.0, 1, 0.1, method="exact", cache=cache)
+    assert cache.hits == 1 and cache.misses == 1
+
+    model.save(str(tmp_path / "run"))
+    assert np.array_equal(ExponentialDecay.load(str(tmp_path / "run")).u, u)
+
+
+def test_solve_exact_mode_raises_ValueError_for_arrays():
+    with pytest.raises(ValueError):
+        ExponentialDecay([0.1, 0.4]).solve(1.0, 1, 0.1, method="exact")
@@ -0,0 +1,52 @@
+import pytest
+import numpy as np
+from fern import IFS, AffineTransform
+
+
+def test_matrix():
+    f = AffineTransform(a=1, b=2, c=3, d=4, e=5, f=6)
+    assert np.all(f.matrix == [[1, 2, 5], [3, 4, 6]])
+    x, y = 0.3, -0.7
+    assert np.allclose(f.matrix @ [x, y, 1], f(x, y))
+
+
+@pytest.mark.parametrize("N, walkers", [(1, 4096), (1000, 7), (50000, 4096)])
+def test_iterating_shape(N, walkers):
+    ifs = IFS.from_transforms(AffineTransform().functions(), AffineTransform.prob)
+    X = ifs.iterate(N, walkers=walkers, rng=np.random.default_rng(0))
+    assert X.shape == (N, 2)
+
+
+def test_single_map_converges_to_fixed_point():
+    ifs = IFS([[[0.5, 0, 1], [0, 0.5, -1]]], [1])
+    assert np.allclose(ifs.fixed_point(), [2, -2])
+    assert np.allclose(ifs.iterate(100), [2, -2])
+
+
+def test_points_stay_in_fern():
+    X = AffineTransform().iterating(10000, rng=np.random.default_rng(1))
+    assert np.all((X[:, 0] > -2.2) & (X[:, 0] < 2.7))
+    assert np.all((X[:, 1] >= 0) & (X[:, 1] < 10))
+
+
+@pytest.mark.parametrize("prob", [[0.5, 0.6], [1.2, -0.2], [1]])
+def test_init_raises_ValueError(prob):
+    with pytest.raises(ValueError):
+        IFS(np.zeros((2, 2, 3)), prob)
+
+
+def test_iterating_dtype():
+    X = AffineTransform().iterating(1000, rng=np.random.default_rng(2))
+    Y = AffineTransform().iterating(
+        1000, rng=np.random.default_rng(2), dtype=np.float32
+    )
+    assert Y.dtype == np.float32
+    assert np.allclose(X, Y, atol=1e-5)
+
+
+def test_iterate_chunks():
+    ifs = IFS.from_transforms(AffineTransform().functions(), AffineTransform.prob)
+    chunks = list(ifs.iterate_chunks(10000, 1000, walkers=100, growth=2))
+    assert [len(X) for X in chunks] == [1000, 2000, 4000, 3000]
+    X = np.concatenate(chunks)
+    assert np.all((X[:, 1] >= 0) & (X[:, 1] < 10))
@@ -1,7 +1,7 @@
 import pytest
 from math import pi
 import numpy as np
-from pendulum import Pendulum
+from pendulum import Pendulum, DampenedPendulum
 
 
 @pytest.mark.parametrize(
@@ -37,3 +37,159 @@ def test_translating():
     p.solve((0.2, 0.3), 5, 0.1)
     tol = 1e-14
     assert abs(all(p.x ** 2 + p.y ** 2 - 1 <= tol))
+
+
+def test_derived_properties_are_cached_until_solve():
+    p = Pendulum()
+    p.solve((0.2, 0.3), 5, 0.1)
+    kinetic = p.kinetic
+    assert p.kinetic is kinetic
+    p.solve((0.4, 0.3), 5, 0.1)
+    assert p.kinetic is not kinetic
+    assert not np.allclose(p.kinetic, kinetic)
+
+
+def test_changing_parameter_clears_cache():
+    p = Pendulum()
+    p.solve((0.2, 0.3), 5, 0.1)
+    x = p.x
+    p.L = 2
+    assert np.allclose(p.x, 2 * x)
+
+
+def test_memoize_off():
+    p = Pendulum(memoize=False)
+    p.solve((0.2, 0.3), 5, 0.1)
+    assert p.x is not p.x
+    assert np.all(p.x == p.x)
+
+
+def test_solve_stores_solution_with_options():
+    p = Pendulum()
+    p.solve((0.2, 0.3), 5, 0.1, method="DOP853", rtol=1e-10, atol=1e-10)
+    assert p.solution.success
+    assert np.all(p.theta == p.solution.y[0])
+    exact = Pendulum()
+    exact.solve((0.2, 0.3), 5, 0.1, method="DOP853", rtol=1e-12, atol=1e-12)
+    assert np.allclose(p.theta, exact.theta, atol=1e-8)
+
+
+@pytest.mark.parametrize("p", [Pendulum(L=2.7, M=2), DampenedPendulum(0.8)])
+def test_jac_matches_finite_differences(p):
+    y, h = np.array([0.5, 0.2]), 1e-6
+    J = np.zeros((2, 2))
+    for j in range(2):
+        e = np.zeros(2)
+        e[j] = h
+        J[:, j] = (np.array(p(0, y + e)) - np.array(p(0, y - e))) / (2 * h)
+    assert np.allclose(p.jac(0, y), J, atol=1e-8)
+
+
+@pytest.mark.parametrize("method, tol", [("verlet", 1e-3), ("yoshida4", 1e-5)])
+def test_symplectic_methods_converge(method, tol):
+    exact = Pendulum()
+    exact.solve([1.0, 0], 10, 0.01, method="DOP853", rtol=1e-12, atol=1e-12)
+    p = Pendulum()
+    p.solve([1.0, 0], 10, 0.01, method=method)
+    assert np.all(p.t == exact.t)
+    assert abs(p.theta - exact.theta).max() < tol
+
+
+@pytest.mark.parametrize("method", ["verlet", "yoshida4"])
+def test_symplectic_methods_with_fast(method):
+    from solution_cache import SolutionCache
+
+    cache = SolutionCache()
+    p = Pendulum()
+    p.solve([1.0, 0], 10, 0.01, method=method, cache=cache)
+    theta = p.theta
+    p.solve([1.0, 0], 10, 0.01, method=method, fast=True, cache=cache)
+    assert np.array_equal(p.theta, theta)
+    assert cache.hits == 1
+
+
+def test_symplectic_method_conserves_energy():
+    p = Pendulum()
+    p.solve([1.0, 0], 1000, 0.01, method="yoshida4")
+    energy = 0.5 * p.omega ** 2 - p.g * np.cos(p.theta)
+    assert abs(energy - energy[0]).max() < 1e-5
+
+
+def test_symplectic_method_raises_ValueError_with_damping():
+    with pytest.raises(ValueError):
+        DampenedPendulum(0.8).solve([1.0, 0], 10, 0.01, method="verlet")
+
+
+@pytest.mark.parametrize("p", [Pendulum(L=2.7, M=2), DampenedPendulum(0.8)])
+def test_fast_rhs_matches_call(p):
+    y = np.array([[0.5, -1.2, 3.0], [0.2, 0.0, -0.7]])
+    assert np.allclose(p._fast_rhs()(0, y), p(0, y))
+    assert np.allclose(p._fast_rhs()(0, y[:, 0]), p(0, y[:, 0]))
+    p.solve([0.5, 0.2], 5, 0.1)
+    theta = p.theta
+    p.solve([0.5, 0.2], 5, 0.1, fast=True)
+    assert np.allclose(p.theta, theta)
+
+
+def test_analytic_velocities_match_gradient():
+    p = Pendulum(L=2, M=3)
+    p.solve([1.0, 0.5], 5, 0.001, rtol=1e-10, atol=1e-10)
+    q = Pendulum(L=2, M=3, velocities="gradient")
+    q.solve([1.0, 0.5], 5, 0.001, rtol=1e-10, atol=1e-10)
+    assert np.allclose(p.vx[1:-1], q.vx[1:-1], atol=1e-4)
+    assert np.allclose(p.vy[1:-1], q.vy[1:-1], atol=1e-4)
+    assert np.allclose(p.kinetic, 0.5 * p.M * (p.vx ** 2 + p.vy ** 2))
+
+
+def test_velocities_raises_ValueError():
+    with pytest.raises(ValueError):
+        Pendulum(velocities="finite")
+
+
+def test_lazy_solve_evaluates_grid_on_demand():
+    p = Pendulum()
+    p.solve([1.0, 0], 10, 0.01)
+    q = Pendulum()
+    q.solve([1.0, 0], 10, 0.01, lazy=True)
+    assert "_theta" not in q.__dict__
+    assert np.allclose(q.t, p.t)
+    assert np.allclose(q.theta, p.theta)
+
+
+def test_at_and_iter_chunks():
+    p = Pendulum()
+    p.solve([1.0, 0], 10, 0.01, lazy=True)
+    view = p.at([0, 2.5])
+    assert np.allclose(view.theta[0], 1.0)
+    assert view.kinetic.shape == (2,)
+    chunks = list(p.iter_chunks(chunk_size=300))
+    assert [len(chunk.t) for chunk in chunks] == [300, 300, 300, 101]
+    assert np.allclose(np.concatenate([chunk.x for chunk in chunks]), p.x)
+
+
+def test_at_raises_ValueError_without_dense_output():
+    p = Pendulum()
+    p.solve([1.0, 0], 1, 0.1)
+    with pytest.raises(ValueError):
+        p.at(0.5)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_roundtrip(tmp_path, mmap):
+    p = DampenedPendulum(0.8, velocities="gradient")
+    p.solve([1.0, 0.5], 5, 0.01)
+    p.save(str(tmp_path / "run"))
+    q = DampenedPendulum.load(str(tmp_path / "run"), mmap=mmap)
+    assert isinstance(q.theta, np.memmap) == mmap
+    assert (q.B, q.L, q.velocities) == (p.B, p.L, p.velocities)
+    assert np.array_equal(q.t, p.t)
+    for name in ("theta", "omega", "x", "vy", "potential", "kinetic"):
+        assert np.array_equal(getattr(q, name), getattr(p, name))
+
+
+def test_load_checks_model(tmp_path):
+    p = Pendulum()
+    p.solve([1.0, 0], 1, 0.1)
+    p.save(str(tmp_path / "run"))
+    with pytest.raises(ValueError):
+        DampenedPendulum.load(str(tmp_path / "run"))
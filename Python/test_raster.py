@@ -0,0 +1,92 @@
+import pytest
+import numpy as np
+from raster import Rasterizer
+
+
+def test_add_counts_points():
+    raster = Rasterizer((0, 2, 0, 1), resolution=4)
+    assert raster.counts.shape == (2, 4)
+    raster.add([[0.1, 0.1], [0.2, 0.2], [1.9, 0.9], [2, 1], [3, 0.5]])
+    expected = np.array([[2, 0, 0, 0], [0, 0, 0, 2]])
+    assert np.all(raster.counts == expected)
+
+
+def test_incremental_add_matches_single_add():
+    np.random.seed(0)
+    points = np.random.random((1000, 2))
+    colors = np.random.random(1000)
+    single = Rasterizer((0, 1, 0, 1), resolution=16)
+    single.add(points, colors)
+    chunked = Rasterizer((0, 1, 0, 1), resolution=16)
+    for i in range(0, 1000, 300):
+        chunked.add(points[i : i + 300], colors[i : i + 300])
+    assert np.allclose(single.image(), chunked.image())
+
+
+def test_rgb_colors_are_averaged_per_pixel():
+    raster = Rasterizer((0, 1, 0, 1), resolution=1)
+    raster.add([[0.5, 0.5], [0.5, 0.5]], [[1, 0, 0], [0, 0, 1]])
+    assert np.allclose(raster.image(tone="linear")[0, 0], [0.5, 0, 0.5, 1])
+
+
+@pytest.mark.parametrize("extent", [(0, 0, 0, 1), (0, 1, 1, 0)])
+def test_init_raises_ValueError(extent):
+    with pytest.raises(ValueError):
+        Rasterizer(extent)
+
+
+def test_savepng_raises_ValueError():
+    with pytest.raises(ValueError):
+        Rasterizer((0, 1, 0, 1)).savepng("dumt_filnavn.pdf")
+
+
+def test_merge_matches_single_add():
+    np.random.seed(1)
+    points = np.random.random((500, 2))
+    single = Rasterizer((0, 1, 0, 1), resolution=8)
+    single.add(points)
+    merged = single.empty_copy()
+    for part in (points[:200], points[200:]):
+        partial = merged.empty_copy()
+        partial.add(part)
+        merged.merge(partial)
+    assert np.all(single.counts == merged.counts)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float16])
+def test_add_low_precision_points_in_chunks(dtype, monkeypatch):
+    points = np.random.default_rng(3).random((1000, 2))
+    colors = np.random.default_rng(4).random(1000)
+    expected = Rasterizer((0, 1, 0, 1), resolution=50)
+    expected.add(points.astype(dtype).astype(float), colors)
+    monkeypatch.setattr(Rasterizer, "CHUNK_SIZE", 64)
+    raster = Rasterizer((0, 1, 0, 1), resolution=50)
+    raster.add(points.astype(dtype), colors.astype(np.float32))
+    assert np.array_equal(raster.counts, expected.counts)
+    assert np.allclose(raster.image(), expected.image(), atol=1e-6)
+
+
+def test_refine_stops_when_converged():
+    rng = np.random.default_rng(5)
+    consumed = []
+
+    def batches():
+        for size in 1000 * 2 ** np.arange(20):
+            consumed.append(size)
+            yield rng.random((size, 2))
+
+    raster = Rasterizer((0, 1, 0, 1), resolution=20)
+    changes = raster.refine(batches(), tol=0.01)
+    assert changes[0] == 1 and changes[-1] < 0.01
+    assert all(change >= 0.01 for change in changes[:-1])
+    assert len(consumed) == len(changes) < 20
+    assert raster.counts.sum() == sum(consumed)
+
+
+def test_refine_with_colors():
+    points = np.random.default_rng(6).random((3000, 2))
+    raster = Rasterizer((0, 1, 0, 1), resolution=10)
+    raster.refine([(points[:1000], np.ones(1000)), (points[1000:], np.zeros(2000))])
+    expected = Rasterizer((0, 1, 0, 1), resolution=10)
+    expected.add(points, np.r_[np.ones(1000), np.zeros(2000)])
+    assert np.allclose(raster.image(), expected.image())
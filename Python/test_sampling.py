@@ -0,0 +1,33 @@
+import pytest
+import numpy as np
+from sampling import AliasSampler
+
+
+@pytest.mark.parametrize(
+    "prob", [[0.01, 0.85, 0.07, 0.07], [1, 1, 1], [0, 3, 1], [1], [0.2, 0, 0.8]]
+)
+def test_sample_frequencies(prob):
+    sampler = AliasSampler(prob)
+    idx = sampler.sample(200000, rng=np.random.default_rng(0))
+    freq = np.bincount(idx, minlength=len(prob)) / len(idx)
+    assert np.allclose(freq, np.array(prob) / np.sum(prob), atol=5e-3)
+
+
+def test_zero_probability_never_drawn():
+    idx = AliasSampler([0.5, 0, 0.5]).sample((100, 100))
+    assert idx.shape == (100, 100)
+    assert not np.any(idx == 1)
+
+
+@pytest.mark.parametrize("prob", [[], [0, 0], [1, -1], [[0.5, 0.5]]])
+def test_init_raises_ValueError(prob):
+    with pytest.raises(ValueError):
+        AliasSampler(prob)
+
+
+def test_sample_does_not_depend_on_chunking():
+    sampler = AliasSampler([0.01, 0.85, 0.07, 0.07])
+    full = sampler.sample(1000, rng=np.random.default_rng(3))
+    rng = np.random.default_rng(3)
+    chunks = [sampler.sample(size, rng=rng) for size in (1, 299, 400, 300)]
+    assert np.array_equal(np.concatenate(chunks), full)
@@ -0,0 +1,108 @@
+import pytest
+import numpy as np
+from solution_cache import SolutionCache
+from pendulum import Pendulum, DampenedPendulum
+from double_pendulum import DoublePendulum
+from exp_decay import ExponentialDecay
+
+
+def test_hit_returns_stored_solution():
+    cache = SolutionCache()
+    p = Pendulum(L=2)
+    p.solve([1.0, 0], 5, 0.01, cache=cache)
+    q = Pendulum(L=2)
+    q.solve([1.0, 0], 5, 0.01, cache=cache)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert q.solution.nfev == 0
+    assert np.array_equal(q.theta, p.theta) and np.array_equal(q.t, p.t)
+    assert np.array_equal(q.kinetic, p.kinetic)
+
+
+@pytest.mark.parametrize(
+    "model, y0, other, change",
+    [
+        (Pendulum(), [0.5, 0], [0.4, 0], {"L": 2}),
+        (DampenedPendulum(0.8), [0.5, 0], [0.5, 0.1], {"B": 0.5}),
+        (DoublePendulum(), [0.5, 0, 0.5, 0], [0.5, 0, 0.4, 0], {"M2": 3}),
+        (ExponentialDecay(0.4), 5, 4, {"a": 0.5}),
+    ],
+)
+def test_key_depends_on_parameters(model, y0, other, change):
+    cache = SolutionCache()
+    model.solve(y0, 1, 0.1, cache=cache)
+    model.solve(y0, 1, 0.1, cache=cache)
+    model.solve(y0, 1, 0.1, method="RK23", cache=cache)
+    model.solve(y0, 2, 0.1, cache=cache)
+    model.solve(other, 1, 0.1, cache=cache)
+    for name, value in change.items():
+        setattr(model, name, value)
+    model.solve(y0, 1, 0.1, cache=cache)
+    assert cache.hits == 1 and cache.misses == 5
+
+
+def test_key_ignores_number_type_of_grid():
+    cache = SolutionCache()
+    p = Pendulum()
+    p.solve([0.5, 0], 5, 0.1, cache=cache)
+    p.solve([0.5, 0], 5.0, 0.1, cache=cache)
+    p.solve([0.5, 0], np.float64(5), 0.1, cache=cache)
+    assert cache.hits == 2 and cache.misses == 1
+
+
+def test_disk_tier_tolerates_deleted_files(tmp_path, monkeypatch):
+    import os
+
+    cache = SolutionCache(path=str(tmp_path))
+    cache.put("a", [0, 1], [[1, 2]])
+    cache.put("b", [0, 1], [[1, 2]])
+    scandir = os.scandir
+
+    def racing_scandir(path):
+        # Another process deletes a file right after it is listed
+        entries = list(scandir(path))
+        if entries:
+            os.remove(entries[0].path)
+        return entries
+
+    monkeypatch.setattr(os, "scandir", racing_scandir)
+    assert cache.stats()["disk_entries"] == 1
+    cache.put("c", [0, 1], [[1, 2]])
+    cache.clear()
+
+
+def test_memory_tier_is_lru():
+    cache = SolutionCache(maxsize=2)
+    for key in "abc":
+        cache.put(key, [0, 1], [[1, 2]])
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    cache.put("d", [0, 1], [[1, 2]])
+    assert cache.get("c") is None and cache.get("b") is not None
+
+
+def test_disk_tier_is_shared_and_bounded(tmp_path):
+    path = str(tmp_path / "cache")
+    first = SolutionCache(path=path)
+    p = Pendulum()
+    p.solve([1.0, 0], 5, 0.01, cache=first)
+
+    second = SolutionCache(path=path)
+    q = Pendulum()
+    q.solve([1.0, 0], 5, 0.01, cache=second)
+    assert second.stats()["disk_hits"] == 1
+    assert np.array_equal(q.omega, p.omega)
+
+    size = second.stats()["disk_bytes"]
+    bounded = SolutionCache(maxsize=0, path=path, max_bytes=2.5 * size)
+    for theta in (0.1, 0.2, 0.3):
+        p.solve([theta, 0], 5, 0.01, cache=bounded)
+    assert bounded.stats()["disk_entries"] == 2
+    p.solve([0.3, 0], 5, 0.01, cache=bounded)
+    assert bounded.stats()["disk_hits"] == 1
+
+
+def test_lazy_solves_bypass_cache():
+    cache = SolutionCache()
+    p = Pendulum()
+    p.solve([1.0, 0], 1, 0.1, lazy=True, cache=cache)
+    assert cache.stats()["misses"] == 0 and cache.stats()["memory_entries"] == 0
@@ -0,0 +1,39 @@
+import numpy as np
+from triangle import (
+    list_corners_and_colors,
+    color_sequence,
+    sequence,
+    alternative_sequence,
+    fancy_color_sequence,
+)
+
+
+def test_color_sequence_follows_recurrences():
+    corners, colors = list_corners_and_colors()
+    X, C, idx = color_sequence(1000)
+    assert X.shape == (995, 2) and C.shape == (995, 3) and idx.shape == (995,)
+    assert np.allclose(X[1:], (X[:-1] + np.array(corners)[idx[1:]]) / 2)
+    assert np.allclose(C[1:], (C[:-1] + np.array(colors)[idx[1:]]) / 2)
+    assert np.allclose(C.sum(axis=1), 1)
+
+
+def test_sequences_are_views_of_color_sequence():
+    np.random.seed(7)
+    X, C, idx = color_sequence(500)
+    np.random.seed(7)
+    assert np.array_equal(fancy_color_sequence(500)[1], C)
+    np.random.seed(7)
+    Y, corners = alternative_sequence(500)
+    assert np.array_equal(corners, idx) and np.allclose(Y, X)
+    np.random.seed(7)
+    assert np.allclose(sequence(500), X)
+
+
+def test_color_sequence_dtype_and_chunks():
+    np.random.seed(5)
+    X, C, idx = color_sequence(3000)
+    np.random.seed(5)
+    Y, D, jdx = color_sequence(3000, dtype=np.float32, chunk_size=7)
+    assert Y.dtype == D.dtype == np.float32 and jdx.dtype == np.uint8
+    assert np.array_equal(idx, jdx)
+    assert np.allclose(X, Y, atol=1e-6) and np.allclose(C, D, atol=1e-6)
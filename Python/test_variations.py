@@ -0,0 +1,97 @@
+import pytest
+import numpy as np
+from variations import Variations, LinearCombination, linear_combination_wrap
+
+NAMES = ["linear", "handkerchief", "swirl", "disc"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 2 ** 14])
+def test_evaluate_matches_static_methods(chunk_size):
+    x, y = np.random.default_rng(1).uniform(-2, 2, (2, 1001))
+    out = Variations.evaluate(x, y, NAMES, chunk_size=chunk_size)
+    assert out.shape == (4, 2, 1001)
+    for name, (u, v) in zip(NAMES, out):
+        expected_u, expected_v = getattr(Variations, name)(x, y)
+        assert np.allclose(u, expected_u, rtol=0, atol=1e-14)
+        assert np.allclose(v, expected_v, rtol=0, atol=1e-14)
+
+
+def test_evaluate_writes_to_out():
+    x, y = np.random.default_rng(2).uniform(-1, 1, (2, 50))
+    out = np.empty((2, 2, 50))
+    assert Variations.evaluate(x, y, ["swirl", "disc"], out=out) is out
+    with pytest.raises(ValueError):
+        Variations.evaluate(x, y, ["swirl"], out=out)
+
+
+def test_evaluate_raises_for_unknown_name():
+    with pytest.raises(ValueError):
+        Variations.evaluate([0.5], [0.5], ["linear", "spiral"])
+
+
+def test_transform():
+    variation = Variations([0.5, -0.2], [0.1, 0.3], "handkerchief")
+    u, v = variation.transform()
+    expected_u, expected_v = Variations.handkerchief(variation.x, variation.y)
+    assert np.allclose(u, expected_u) and np.allclose(v, expected_v)
+
+
+@pytest.mark.parametrize("name", ["linear", "swirl", "disc"])
+def test_transform_keeps_shape(name):
+    x, y = np.meshgrid(np.linspace(-1, 1, 5), np.linspace(-1, 1, 4))
+    u, v = Variations(x, y, name).transform()
+    expected_u, expected_v = getattr(Variations, name)(x, y)
+    assert u.shape == v.shape == (4, 5)
+    assert np.allclose(u, expected_u) and np.allclose(v, expected_v)
+
+    u, v = Variations(0.5, -0.25, name).transform()
+    assert np.shape(u) == np.shape(v) == ()
+
+    v1, v2 = Variations(x, y, name), Variations(x, y, "disc")
+    combination = linear_combination_wrap(v1, v2)
+    assert combination(0.5)[0].shape == (4, 5)
+    assert combination([0.2, 0.5, 1])[1].shape == (3, 4, 5)
+
+
+def test_linear_combination_matches_formula():
+    x, y = np.random.default_rng(3).uniform(-1, 1, (2, 200))
+    v1, v2 = Variations(x, y, "disc"), Variations(x, y, "swirl")
+    combination = linear_combination_wrap(v1, v2)
+    (u1, w1), (u2, w2) = v1.transform(), v2.transform()
+    u, v = combination(0.3)
+    assert np.allclose(u, 0.3 * u1 + 0.7 * u2) and np.allclose(v, 0.3 * w1 + 0.7 * w2)
+
+    weights = np.linspace(0, 1, 5)
+    U, V = combination(weights)
+    assert U.shape == V.shape == (5, 200)
+    for w, u, v in zip(weights, U, V):
+        assert np.allclose(u, w * u1 + (1 - w) * u2)
+        assert np.allclose(v, w * w1 + (1 - w) * w2)
+
+
+def test_linear_combination_of_several_variations():
+    x, y = np.random.default_rng(4).uniform(-1, 1, (2, 100))
+    variations = [Variations(x, y, name) for name in NAMES]
+    combination = LinearCombination(*variations)
+    weights = np.array([[0.1, 0.2, 0.3, 0.4], [1, 0, 0, 0]])
+    U, V = combination(weights)
+    expected = sum(w * np.array(v.transform()) for w, v in zip(weights[0], variations))
+    assert np.allclose(U[0], expected[0]) and np.allclose(V[0], expected[1])
+    assert np.allclose(U[1], x) and np.allclose(V[1], y)
+    with pytest.raises(ValueError):
+        combination([0.5, 0.5, 0.5, 0.5])
+    with pytest.raises(ValueError):
+        combination([0.5, 0.5])
+
+
+def test_linear_combination_transforms_once(monkeypatch):
+    x, y = np.random.default_rng(5).uniform(-1, 1, (2, 10))
+    combination = LinearCombination(Variations(x, y, "disc"), Variations(x, y, "swirl"))
+    calls = []
+    evaluate = Variations.evaluate
+    monkeypatch.setattr(
+        Variations, "evaluate", lambda *args: calls.append(1) or evaluate(*args)
+    )
+    for w in np.linspace(0, 1, 10):
+        combination(w)
+    assert len(calls) == 1
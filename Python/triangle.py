@@ -1,5 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
+from chaos_game import _linear_scan
+from raster import Rasterizer
 
 
 def list_corners_and_colors():
@@ -46,7 +48,75 @@ def starting_point():
     return X, C
 
 
-def sequence(N):
+def color_sequence(N, color=True, dtype=None, chunk_size=10 ** 6):
+    """
+    Generate a sequence of points within the triangle, and optionally their
+    RGB colors, according to the formulas
+
+    x(k+1) = (x(k) + c(k+1))/2,
+    C(k+1) = (C(k) + r(k+1))/2,
+
+    where c(k+1) is one of the triangle's corners selected at random and
+    r(k+1) the basis color of that corner.
+
+    Both recurrences are the same linear averaging, so they are evaluated
+    together as one vectorized scan over the points and colors side by
+    side, with chaos_game._linear_scan. The scan runs chunk_size steps at a
+    time, carrying the last state over, and writes into preallocated
+    output, so N in the tens of millions only needs O(chunk_size) float64
+    working memory.
+
+    Discard the starting point and the first five points generated.
+
+    Parameters
+    ----------
+    N:          int, length of sequence to be generated -5
+    color:      bool, default True, if False the colors are not computed
+    dtype:      floating point type of X and C, e.g. np.float32 or
+                np.float16 to save memory, in which case idx is stored as
+                np.uint8. Default None, giving float64 and int64
+    chunk_size: int, number of steps scanned at a time, default 10**6
+
+    Returns
+    --------
+    X:      NumPy array of size (N-5, 2), containing the sequence of points,
+            the first five points excluded
+    C:      NumPy array of size (N-5, 3), containing the RGB colors
+            associated with each point, or None if color is False
+    idx:    NumPy array of size N-5, containing the randomly selected
+            corners used in the formula, the first five excluded
+    """
+
+    corners, colors = list_corners_and_colors()
+    X0, C0 = starting_point()
+    if color:
+        state = np.concatenate((X0, C0))
+        steps = np.hstack((corners, colors)) / 2
+    else:
+        state = X0
+        steps = np.array(corners) / 2
+
+    discard = 5
+    size = max(N - discard, 0)
+    XC = np.empty((size, len(state)), dtype=float if dtype is None else dtype)
+    idx = np.empty(size, dtype=int if dtype is None else np.uint8)
+    for start in range(0, N, chunk_size):
+        i = np.random.randint(0, 3, size=min(chunk_size, N - start))
+        if start == 0:
+            block = _linear_scan(state, steps[i[1:]], 1 / 2)
+        else:
+            block = _linear_scan(state, steps[i], 1 / 2)[1:]
+        state = block[-1]
+        skip = max(0, discard - start)
+        if skip >= len(block):
+            continue
+        first = start + skip - discard
+        XC[first : first + len(block) - skip] = block[skip:]
+        idx[first : first + len(i) - skip] = i[skip:]
+    return XC[:, :2], XC[:, 2:] if color else None, idx
+
+
+def sequence(N, dtype=None):
     """
     Generate a sequence of points within the triangle, given
     a starting point x0, according to formula
@@ -60,6 +130,7 @@ def sequence(N):
     Parameters
     ----------
     N:      int, length of sequence to be generate -6
+    dtype:  floating point type of X, see color_sequence
 
     Returns
     --------
@@ -67,16 +138,10 @@ def sequence(N):
             the first five point excluded
     """
 
-    corners = list_corners_and_colors()[0]
-    X = np.zeros((N, 2))
-    X[0, :] = starting_point()[0]
-    ci = np.array([corners[i] for i in np.random.randint(0, 3, size=N)])
-    for i in range(N - 1):
-        X[i + 1, :] = (X[i, :] + ci[i + 1]) / 2
-    return X[5:, :]
+    return color_sequence(N, color=False, dtype=dtype)[0]
 
 
-def alternative_sequence(N):
+def alternative_sequence(N, dtype=None):
     """
     Generate a sequence of points in the same way as sequence(N).
     Also return the randomly selected corners.
@@ -86,6 +151,7 @@ def alternative_sequence(N):
     Parameters
     ----------
     N:      int, length of sequence to be generated -6
+    dtype:  floating point type of X, see color_sequence
 
     Returns
     --------
@@ -95,17 +161,11 @@ def alternative_sequence(N):
             used in the formula, the first five excluded.
     """
 
-    corners = list_corners_and_colors()[0]
-    X = np.zeros((N, 2))
-    X[0, :] = starting_point()[0]
-    idx = np.random.randint(0, 3, size=N)
-    ci = np.array([corners[i] for i in idx])
-    for i in range(N - 1):
-        X[i + 1, :] = (X[i, :] + ci[i + 1]) / 2
-    return X[5:, :], idx[5:]
+    X, C, idx = color_sequence(N, color=False, dtype=dtype)
+    return X, idx
 
 
-def fancy_color_sequence(N):
+def fancy_color_sequence(N, dtype=None):
     """
     Generate a sequence of the same kind as sequence(N) accompanied
     by a matrix of RGB colors for each point.
@@ -113,6 +173,7 @@ def fancy_color_sequence(N):
     Parameters
     ----------
     N:      int, length of sequence to generated -6
+    dtype:  floating point type of X and C, see color_sequence
 
     Returns
     --------
@@ -122,19 +183,11 @@ def fancy_color_sequence(N):
             with each point.
     """
 
-    corners, colors = list_corners_and_colors()
-    X = np.zeros((N, 2))
-    C = np.zeros((N, 3))
-    X[0, :], C[0, :] = starting_point()
-    idx = np.random.randint(0, 3, size=N)
-    ci = np.array([corners[i] for i in idx])
-    for i in range(N - 1):
-        X[i + 1, :] = (X[i, :] + ci[i + 1]) / 2
-        C[i + 1, :] = (C[i, :] + colors[idx[i + 1]]) / 2
-    return X[5:, :], C[5:, :]
+    X, C, idx = color_sequence(N, dtype=dtype)
+    return X, C
 
 
-def plot_points(N=10006):
+def plot_points(N=10006, raster=False, points=None):
     """
     Generate a sequence of N points using alternative_sequence(N+6)
     and plot them in different colors in accordance with the colors
@@ -143,21 +196,30 @@ def plot_points(N=10006):
     Parameters
     ----------
     N:      int, default 10006, number of points to be plotted -6
+    raster: bool, default False, if True the points are binned into
+            a density image instead of scattered one by one
+    points: tuple (X, C, idx) from color_sequence to plot instead of
+            generating a new sequence, default None
     """
 
-    seq, colors = alternative_sequence(N)
-    red = seq[colors == 0]
-    green = seq[colors == 1]
-    blue = seq[colors == 2]
+    seq, _, colors = color_sequence(N, color=False) if points is None else points
     fig, ax = plt.subplots()
-    for clr in ["red", "green", "blue"]:
-        plt.scatter(eval(clr)[:, 0], eval(clr)[:, 1], s=0.1, marker=".", color=clr)
+    if raster:
+        Rasterizer.from_points(seq, np.eye(3)[colors]).show(ax)
+    else:
+        red = seq[colors == 0]
+        green = seq[colors == 1]
+        blue = seq[colors == 2]
+        for clr in ["red", "green", "blue"]:
+            plt.scatter(
+                eval(clr)[:, 0], eval(clr)[:, 1], s=0.1, marker=".", color=clr
+            )
     ax.axis("equal")
     ax.axis("off")
     plt.show()
 
 
-def plot_points_fancy_colors(N=10006):
+def plot_points_fancy_colors(N=10006, raster=False, points=None):
     """
     Generate a sequence of N points and corresponding RGB coloring using
     fancy_color_sequence(N+6) and plot them.
@@ -165,15 +227,23 @@ def plot_points_fancy_colors(N=10006):
     Parameters
     ----------
     N:      int, default 10006, number of points to be plotted -6
+    raster: bool, default False, if True the points are binned into
+            a density image instead of scattered one by one
+    points: tuple (X, C, idx) from color_sequence to plot instead of
+            generating a new sequence, default None
     """
-    X, C = fancy_color_sequence(N)
+    X, C, _ = color_sequence(N) if points is None else points
     fig, ax = plt.subplots()
     ax.axis("equal")
     ax.axis("off")
-    plt.scatter(*zip(*X), c=C, s=0.2)
+    if raster:
+        Rasterizer.from_points(X, C).show(ax)
+    else:
+        plt.scatter(*zip(*X), c=C, s=0.2)
     plt.show()
 
 
 if __name__ == "__main__":
-    plot_points()
-    plot_points_fancy_colors()
+    points = color_sequence(10006)
+    plot_points(points=points)
+    plot_points_fancy_colors(points=points)
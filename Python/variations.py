@@ -1,6 +1,52 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from chaos_game import ChaosGame
+from raster import Rasterizer
+
+
+def _linear(x, y, polar, u, v, s, c):
+    u[:] = x
+    v[:] = y
+
+
+def _swirl(x, y, polar, u, v, s, c):
+    np.sin(polar["r2"], out=s)
+    np.cos(polar["r2"], out=c)
+    np.multiply(x, s, out=u)
+    np.multiply(y, c, out=v)
+    u -= v
+    np.multiply(x, c, out=v)
+    s *= y
+    v += s
+
+
+def _handkerchief(x, y, polar, u, v, s, c):
+    r, theta = polar["r"], polar["theta"]
+    np.add(theta, r, out=s)
+    np.sin(s, out=s)
+    np.multiply(r, s, out=u)
+    np.subtract(theta, r, out=c)
+    np.cos(c, out=c)
+    np.multiply(r, c, out=v)
+
+
+def _disc(x, y, polar, u, v, s, c):
+    np.divide(polar["theta"], np.pi, out=s)
+    np.multiply(np.pi, polar["r"], out=c)
+    np.sin(c, out=u)
+    np.cos(c, out=v)
+    u *= s
+    v *= s
+
+
+# In-place kernel of each variation, writing the transformed chunk x, y to
+# u, v with s, c as scratch space, and the polar quantities it reads.
+_KERNELS = {
+    "linear": (_linear, ()),
+    "swirl": (_swirl, ("r2",)),
+    "handkerchief": (_handkerchief, ("r2", "r", "theta")),
+    "disc": (_disc, ("r2", "r", "theta")),
+}
 
 
 class Variations:
@@ -47,10 +93,66 @@ class Variations:
 
     def transform(self):
         """
-        Returns the tranformed vectors.
+        Returns the tranformed vectors, of the same shape as x.
         """
-        _func = getattr(Variations, self.name)
-        return _func(self.x, self.y)
+        u, v = Variations.evaluate(self.x, self.y, [self.name])[0]
+        return u.reshape(np.shape(self.x)), v.reshape(np.shape(self.x))
+
+    @staticmethod
+    def evaluate(x, y, names, chunk_size=2 ** 14, out=None):
+        """
+        Evaluate several transformations of the same vectors in one pass.
+
+        The vectors are processed chunk_size at a time, small enough for the
+        working arrays to stay in cache. For each chunk, r**2, r and theta
+        are computed once and shared by all the transformations, which
+        write their results straight into the output with in-place ufuncs.
+
+        Parameters:
+        ----------
+        x:          arraylike, x-values of vectors to be transformed
+        y:          arraylike, y-values of vectors to be transformed
+        names:      list of strings, names of the transformations
+        chunk_size: int, number of vectors per chunk
+        out:        NumPy array of size (len(names), 2, N) the result is
+                    written to. Default is None, allocating a new array
+
+        Returns:
+        --------
+        out:        NumPy array of size (len(names), 2, N), where out[k]
+                    holds u, v of transformation names[k]
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        unknown = [name for name in names if name not in _KERNELS]
+        if unknown:
+            raise ValueError(f"Unknown transformations: {', '.join(unknown)}")
+        if out is None:
+            out = np.empty((len(names), 2, len(x)))
+        elif out.shape != (len(names), 2, len(x)):
+            raise ValueError("out must be of size (len(names), 2, len(x))")
+
+        kernels = [_KERNELS[name][0] for name in names]
+        needs = set().union(*(_KERNELS[name][1] for name in names))
+        size = min(chunk_size, len(x))
+        work = {key: np.empty(size) for key in ("r2", "r", "theta", "s", "c")}
+        for start in range(0, len(x), chunk_size):
+            stop = min(start + chunk_size, len(x))
+            xc, yc = x[start:stop], y[start:stop]
+            buffers = {key: array[: stop - start] for key, array in work.items()}
+            r2, r, theta = buffers["r2"], buffers["r"], buffers["theta"]
+            s, c = buffers["s"], buffers["c"]
+            if "r2" in needs:
+                np.multiply(xc, xc, out=r2)
+                np.multiply(yc, yc, out=s)
+                r2 += s
+            if "r" in needs:
+                np.sqrt(r2, out=r)
+            if "theta" in needs:
+                np.arctan2(yc, xc, out=theta)
+            for kernel, (u, v) in zip(kernels, out[:, :, start:stop]):
+                kernel(xc, yc, buffers, u, v, s, c)
+        return out
 
     @classmethod
     def from_chaos_game(self, game, name):
@@ -60,22 +162,22 @@ class Variations:
         return Variations(game.points[:, 0], game.points[:, 1], name)
 
 
-def plot_black(N=150):
+def plot_black(N=150, raster=False):
     grid_values = np.linspace(-1, 1, N)
     x, y = np.meshgrid(grid_values, grid_values)
     x_values = x.flatten()
     y_values = y.flatten()
 
     transformations = ["linear", "handkerchief", "swirl", "disc"]
-    variations = [
-        Variations(x_values, y_values, version) for version in transformations
-    ]
+    transformed = Variations.evaluate(x_values, y_values, transformations)
 
     fig, axs = plt.subplots(2, 2, figsize=(10, 10))
-    for ax, variation in zip(axs.flatten(), variations):
-        u, v = variation.transform()
-        ax.scatter(u, -v, s=0.2, marker=".", color="black")
-        ax.set_title(variation.name)
+    for ax, name, (u, v) in zip(axs.flatten(), transformations, transformed):
+        if raster:
+            Rasterizer.from_points(np.column_stack((u, -v))).show(ax)
+        else:
+            ax.scatter(u, -v, s=0.2, marker=".", color="black")
+        ax.set_title(name)
         ax.axis("equal")
         ax.axis("off")
 
@@ -83,24 +185,111 @@ def plot_black(N=150):
     plt.show()
 
 
-def plot_color(N=10000, n=4):
+def plot_color(N=10000, n=4, raster=False):
     transformations = ["linear", "handkerchief", "swirl", "disc"]
     game = ChaosGame(n)
     game.iterate(N)
-    variations = [
-        Variations.from_chaos_game(game, version) for version in transformations
-    ]
+    x, y = game.points.T
+    transformed = Variations.evaluate(x, y, transformations)
+    colors = game.gradient_color
     fig, axs = plt.subplots(2, 2, figsize=(10, 10))
-    for ax, variation in zip(axs.flatten(), variations):
-        u, v = variation.transform()
-        ax.scatter(u, -v, s=1, marker=".", c=game.gradient_color[:, 0], cmap="jet")
-        ax.set_title(variation.name)
+    for ax, name, (u, v) in zip(axs.flatten(), transformations, transformed):
+        if raster:
+            Rasterizer.from_points(np.column_stack((u, -v)), colors).show(ax)
+        else:
+            ax.scatter(u, -v, s=1, marker=".", c=colors, cmap="jet")
+        ax.set_title(name)
         ax.axis("equal")
         ax.axis("off")
 
     plt.show()
 
 
+class LinearCombination:
+    """
+    Linear combination of transformations, sum_k w[k] * variations[k],
+    with weights summing to 1.
+
+    The transformations are evaluated once, on first use, and cached, so
+    evaluating the combination for many weights only costs the blending.
+    If all the variations transform the same vectors, they are evaluated
+    together in one pass with Variations.evaluate. Changing the vectors of
+    the variations afterwards is not picked up.
+    """
+
+    def __init__(self, *variations):
+        """
+        Parameters:
+        ----------
+        variations: instances of class Variations, of vectors of the same
+                    size, at least two
+        """
+        if len(variations) < 2:
+            raise ValueError("A linear combination needs at least two variations!")
+        self.variations = variations
+        self._transformed = None
+
+    @property
+    def transformed(self):
+        """
+        NumPy array of size (len(variations), 2, N) holding u, v of each
+        variation.
+        """
+        if self._transformed is None:
+            first = self.variations[0]
+            if all(
+                np.array_equal(v.x, first.x) and np.array_equal(v.y, first.y)
+                for v in self.variations[1:]
+            ):
+                names = [v.name for v in self.variations]
+                self._transformed = Variations.evaluate(first.x, first.y, names)
+            else:
+                self._transformed = np.array(
+                    [np.ravel(v.transform()) for v in self.variations]
+                ).reshape(len(self.variations), 2, -1)
+        return self._transformed
+
+    def weights(self, w):
+        """
+        Returns the weights w as a NumPy array of size (len(variations),) or
+        (M, len(variations)). For two variations, a float or an array of
+        size M gives the weights of the first variation, and the second
+        gets the rest, like linear_combination_wrap.
+        """
+        w = np.asarray(w, dtype=float)
+        k = len(self.variations)
+        if k == 2 and w.ndim < 2:
+            w = np.stack((w, 1 - w), axis=-1)
+        if w.ndim not in (1, 2) or w.shape[-1] != k:
+            raise ValueError(f"Weights must be of size ({k},) or (M, {k})!")
+        if not np.allclose(w.sum(axis=-1), 1):
+            raise ValueError("Weights must sum to 1!")
+        return w
+
+    def __call__(self, w):
+        """
+        Returns the linear combination u, v for the weights w.
+
+        Parameters:
+        ----------
+        w:      weights, see weights. A vector of weights per combination
+                gives all the combinations at once
+
+        Returns:
+        --------
+        u, v:   NumPy arrays of the shape of the vectors, with a leading
+                axis of size M for M combinations, views into a single
+                array of blended vectors
+        """
+        w = self.weights(w)
+        transformed = self.transformed
+        k, _, N = transformed.shape
+        blended = w @ transformed.reshape(k, 2 * N)
+        blended = blended.reshape(w.shape[:-1] + (2, N))
+        shape = w.shape[:-1] + np.shape(self.variations[0].x)
+        return blended[..., 0, :].reshape(shape), blended[..., 1, :].reshape(shape)
+
+
 def linear_combination_wrap(v1, v2):
     """
     Method to generate linear combination of transformations
@@ -112,19 +301,15 @@ def linear_combination_wrap(v1, v2):
 
     Returns:
     --------
-    func:   callable function, function that given a weight w returns
-            the linear combination of two tranformations
+    func:   LinearCombination, callable that given a weight w, or an array
+            of weights, returns the linear combination of two
+            tranformations w * v1 + (1 - w) * v2
     """
 
-    def func(w):
-        u = w * v1.transform()[0] + (1 - w) * v2.transform()[0]
-        v = w * v1.transform()[1] + (1 - w) * v2.transform()[1]
-        return u, v
+    return LinearCombination(v1, v2)
 
-    return func
 
-
-def plot_lincomb():
+def plot_lincomb(raster=False):
     ngon = ChaosGame(6)
     ngon.iterate(50000)
     coeffs = np.linspace(0, 1, 4)
@@ -132,10 +317,15 @@ def plot_lincomb():
     variation2 = Variations.from_chaos_game(ngon, "swirl")
     variation12 = linear_combination_wrap(variation1, variation2)
 
+    colors = ngon.gradient_color
+    U, V = variation12(coeffs)
+
     fig, axs = plt.subplots(2, 2, figsize=(9, 9))
-    for ax, w in zip(axs.flatten(), coeffs):
-        u, v = variation12(w)
-        ax.scatter(u, -v, s=0.2, marker=".", c=ngon.gradient_color[:, 0], cmap="jet")
+    for ax, w, u, v in zip(axs.flatten(), coeffs, U, V):
+        if raster:
+            Rasterizer.from_points(np.column_stack((u, -v)), colors).show(ax)
+        else:
+            ax.scatter(u, -v, s=0.2, marker=".", c=colors, cmap="jet")
         ax.set_title(f"weight = {w:.2f}")
         ax.axis("off")
         ax.axis("equal")